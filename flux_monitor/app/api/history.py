@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import base64
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Any, Literal
+
+from sqlalchemy import Select
+
+from app.core.db import engine
+from app.core.settings import settings
+
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+_CSV_COLUMNS = ("timestamp", "price", "currency", "last_seen_at", "observations")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def as_utc(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def encode_cursor(moment: datetime, key: int | str) -> str:
+    payload = json.dumps([moment.isoformat(), key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, Any]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor.encode() + b"=" * (-len(cursor) % 4))
+        moment, key = json.loads(payload)
+        return as_utc(datetime.fromisoformat(moment)), key
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+def expanded_timestamps(start: datetime, last_seen_at: datetime | None, observations: int) -> Iterator[datetime]:
+    if observations <= 1 or last_seen_at is None or last_seen_at <= start:
+        yield start
+        return
+
+    step: timedelta = (last_seen_at - start) / (observations - 1)
+    for i in range(observations):
+        yield start + step * i
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _records(rows: Any, expand: bool) -> Iterator[tuple[str, str, str, str | None, int]]:
+    for row in rows:
+        if expand:
+            for moment in expanded_timestamps(row.timestamp, row.last_seen_at, row.observations):
+                yield moment.isoformat(), str(row.price), row.currency, None, 1
+        else:
+            yield row.timestamp.isoformat(), str(row.price), row.currency, _iso(row.last_seen_at), row.observations
+
+
+def _render(rows: Any, output: Literal["ndjson", "csv"], expand: bool) -> str:
+    buffer = io.StringIO()
+    if output == "csv":
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows(_records(rows, expand))
+    else:
+        for record in _records(rows, expand):
+            buffer.write(json.dumps(dict(zip(_CSV_COLUMNS, record)), separators=(",", ":")))
+            buffer.write("\n")
+    return buffer.getvalue()
+
+
+async def stream_price_rows(stmt: Select, output: Literal["ndjson", "csv"], expand: bool) -> AsyncIterator[str]:
+    if output == "csv":
+        yield ",".join(_CSV_COLUMNS) + "\n"
+
+    # The request-scoped session is torn down before a streaming body is sent, so the
+    # generator holds its own connection for the lifetime of the server-side cursor.
+    async with engine.connect() as connection:
+        result = await connection.stream(stmt.execution_options(yield_per=settings.price_stream_chunk_size))
+        async for rows in result.partitions():
+            yield _render(rows, output, expand)
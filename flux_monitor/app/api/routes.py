@@ -1,33 +1,85 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
+from collections.abc import Awaitable
+from datetime import datetime, timedelta, timezone
+from typing import Any, Literal
 
-import anyio
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from redis.exceptions import RedisError
+from sqlalchemy import func, literal, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.schemas import PriceHistoryResponse, PricePoint, TrackRequest, TrackResponse
-from app.core.db import get_session
+from app.api.history import (
+    STREAM_MEDIA_TYPES,
+    InvalidCursor,
+    as_utc,
+    decode_cursor,
+    encode_cursor,
+    expanded_timestamps,
+    stream_price_rows,
+)
+from app.api.schemas import (
+    BulkTrackItem,
+    BulkTrackRequest,
+    BulkTrackResponse,
+    CircuitBreakerState,
+    PriceCandle,
+    PriceHistoryResponse,
+    PricePoint,
+    ScheduleResponse,
+    ScheduleUpdate,
+    TrackRequest,
+    TrackResponse,
+)
+from app.core.cache import get_price_cache
+from app.core.db import engine, get_session
+from app.core.events import price_event_stream, valid_event_id
+from app.core.metrics import metrics_payload, update_db_pool_metrics, update_queue_depth_metrics
+from app.core.settings import settings
 from app.models.price_record import PriceRecord
+from app.models.price_rollup import PriceRollupDay, PriceRollupHour
 from app.models.product import Product
-from app.tasks.scrape import scrape_product
+from app.scraping.circuit_breaker import get_circuit_breaker
+from app.scraping.conditional import get_conditional_store
+from app.scraping.selector_cache import get_selector_cache
+from app.tasks.persist import price_writer_stats
+from app.tasks.inflight import get_inflight_registry
+from app.tasks.schedule import dispatch_scrapes
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_ROLLUP_MODELS = {"hour": PriceRollupHour, "day": PriceRollupDay}
+
 
 @router.get("/healthz")
 async def healthz() -> dict:
     return {"status": "ok"}
 
 
+def _first_due_at(scrape_interval_s: int | None) -> datetime:
+    # The scheduler keeps each product's phase, so a bulk insert due all at once would spike every interval.
+    interval_s = scrape_interval_s or settings.scrape_interval_default_s
+    return datetime.now(timezone.utc) + timedelta(seconds=random.uniform(0, interval_s))
+
+
 @router.post("/track", response_model=TrackResponse, status_code=status.HTTP_201_CREATED)
 async def track_product(payload: TrackRequest, session: AsyncSession = Depends(get_session)) -> TrackResponse:
-    product = Product(name=payload.name, url=str(payload.url), price_selector=payload.price_selector)
+    product = Product(
+        name=payload.name,
+        url=str(payload.url),
+        price_selector=payload.price_selector,
+        scrape_interval_s=payload.scrape_interval_s,
+        next_due_at=_first_due_at(payload.scrape_interval_s),
+    )
     session.add(product)
 
     try:
@@ -41,30 +93,399 @@ async def track_product(payload: TrackRequest, session: AsyncSession = Depends(g
     else:
         await session.refresh(product)
 
-    def _dispatch() -> str | None:
-        result = scrape_product.delay(product.id)
-        return result.id
+    plan = await dispatch_scrapes([product.id], source="track", batched=False)
+    task_id = plan.task_ids.get(product.id)
+    duplicate = product.id in plan.duplicates
 
-    task_id = await anyio.to_thread.run_sync(_dispatch)
+    logger.info(
+        "track_created product_id=%s task_id=%s duplicate=%s url=%s",
+        product.id,
+        task_id,
+        duplicate,
+        product.url,
+    )
 
-    logger.info("track_created product_id=%s task_id=%s url=%s", product.id, task_id, product.url)
+    return TrackResponse(product_id=product.id, task_id=task_id, duplicate=duplicate)
 
-    return TrackResponse(product_id=product.id, task_id=task_id)
 
+async def _upsert_products(session: AsyncSession, items: list[TrackRequest]) -> dict[str, tuple[int, bool]]:
+    products = Product.__table__
+    upserted: dict[str, tuple[int, bool]] = {}
 
-@router.get("/prices/{product_id}", response_model=PriceHistoryResponse)
-async def get_prices(product_id: int, session: AsyncSession = Depends(get_session)) -> PriceHistoryResponse:
+    for start in range(0, len(items), settings.bulk_track_chunk_size):
+        chunk = items[start : start + settings.bulk_track_chunk_size]
+        stmt = pg_insert(products).values(
+            [
+                {
+                    "url": str(item.url),
+                    "name": item.name,
+                    "price_selector": item.price_selector,
+                    "scrape_interval_s": item.scrape_interval_s,
+                    "next_due_at": _first_due_at(item.scrape_interval_s),
+                }
+                for item in chunk
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[products.c.url],
+            set_={
+                "name": func.coalesce(stmt.excluded.name, products.c.name),
+                "price_selector": func.coalesce(stmt.excluded.price_selector, products.c.price_selector),
+                "scrape_interval_s": func.coalesce(stmt.excluded.scrape_interval_s, products.c.scrape_interval_s),
+            },
+        ).returning(products.c.id, products.c.url, literal_column("xmax = 0").label("created"))
+
+        for row in await session.execute(stmt):
+            upserted[row.url] = (row.id, row.created)
+
+    await session.commit()
+    return upserted
+
+
+@router.post("/track/bulk", response_model=BulkTrackResponse, status_code=status.HTTP_201_CREATED)
+async def track_products_bulk(
+    payload: BulkTrackRequest,
+    session: AsyncSession = Depends(get_session),
+) -> BulkTrackResponse:
+    if len(payload.items) > settings.bulk_track_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_track_max_items} items per request",
+        )
+
+    unique = {str(item.url): item for item in payload.items}
+    upserted = await _upsert_products(session, [unique[url] for url in sorted(unique)])
+
+    to_scrape = [product_id for product_id, created in upserted.values() if created or payload.scrape_existing]
+    plan = await dispatch_scrapes(to_scrape, source="track_bulk", as_group=True)
+
+    created = sum(1 for _, was_created in upserted.values() if was_created)
+    logger.info(
+        "track_bulk items=%s unique=%s created=%s dispatched=%s duplicates=%s group_id=%s",
+        len(payload.items),
+        len(unique),
+        created,
+        plan.dispatched,
+        len(plan.duplicates),
+        plan.group_id,
+    )
+
+    return BulkTrackResponse(
+        items=[
+            BulkTrackItem(url=str(item.url), product_id=upserted[str(item.url)][0], created=upserted[str(item.url)][1])
+            for item in payload.items
+        ],
+        created=created,
+        dispatched=plan.dispatched,
+        duplicates=len(plan.duplicates),
+        group_id=plan.group_id,
+    )
+
+
+def _schedule_response(product: Product) -> ScheduleResponse:
+    if product.interval_override_s is not None:
+        interval_s, source, reason = product.interval_override_s, "override", "manual override"
+    elif product.scrape_interval_s is not None:
+        interval_s, source, reason = product.scrape_interval_s, "configured", "scrape_interval_s set on track"
+    elif product.adaptive_interval_s is not None:
+        interval_s, source, reason = product.adaptive_interval_s, "adaptive", product.interval_reason
+    else:
+        interval_s, source, reason = settings.scrape_interval_default_s, "default", product.interval_reason
+
+    return ScheduleResponse(
+        product_id=product.id,
+        interval_s=interval_s,
+        source=source,
+        reason=reason,
+        scrape_interval_s=product.scrape_interval_s,
+        adaptive_interval_s=product.adaptive_interval_s,
+        interval_override_s=product.interval_override_s,
+        next_due_at=product.next_due_at,
+    )
+
+
+async def _get_product(session: AsyncSession, product_id: int) -> Product:
     product = await session.scalar(select(Product).where(Product.id == product_id))
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    return product
+
+
+@router.get("/products/{product_id}/schedule", response_model=ScheduleResponse)
+async def get_schedule(product_id: int, session: AsyncSession = Depends(get_session)) -> ScheduleResponse:
+    return _schedule_response(await _get_product(session, product_id))
 
-    rows = await session.scalars(
-        select(PriceRecord).where(PriceRecord.product_id == product_id).order_by(PriceRecord.timestamp.asc())
-    )
 
-    prices = [
-        PricePoint(price=row.price, currency=row.currency, timestamp=row.timestamp)
-        for row in rows.all()
+@router.put("/products/{product_id}/schedule", response_model=ScheduleResponse)
+async def update_schedule(
+    product_id: int,
+    payload: ScheduleUpdate,
+    session: AsyncSession = Depends(get_session),
+) -> ScheduleResponse:
+    product = await _get_product(session, product_id)
+    product.interval_override_s = payload.interval_override_s
+    if payload.interval_override_s is not None:
+        product.next_due_at = min(product.next_due_at, _first_due_at(payload.interval_override_s))
+    await session.commit()
+
+    logger.info("schedule_updated product_id=%s interval_override_s=%s", product_id, payload.interval_override_s)
+    return _schedule_response(product)
+
+
+def _expand_run(row: Any) -> list[PricePoint]:
+    return [
+        PricePoint(price=row.price, currency=row.currency, timestamp=moment)
+        for moment in expanded_timestamps(row.timestamp, row.last_seen_at, row.observations)
     ]
 
-    return PriceHistoryResponse(product_id=product_id, prices=prices)
+
+def _cursor_position(cursor: str | None, key_type: type) -> tuple[datetime, Any] | None:
+    if cursor is None:
+        return None
+    try:
+        moment, key = decode_cursor(cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if not isinstance(key, key_type):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return moment, key
+
+
+async def _get_candles(
+    session: AsyncSession,
+    product_id: int,
+    resolution: Literal["hour", "day"],
+    since: datetime | None,
+    until: datetime | None,
+    cursor: str | None,
+    page_size: int,
+) -> PriceHistoryResponse:
+    model = _ROLLUP_MODELS[resolution]
+    stmt = select(model).where(model.product_id == product_id)
+    if since is not None:
+        stmt = stmt.where(model.bucket >= since)
+    if until is not None:
+        stmt = stmt.where(model.bucket < until)
+
+    position = _cursor_position(cursor, str)
+    if position is not None:
+        stmt = stmt.where(model.bucket >= position[0]).where(
+            tuple_(model.bucket, model.currency) > tuple_(literal(position[0]), literal(position[1]))
+        )
+
+    rollups = await session.scalars(stmt.order_by(model.bucket.asc(), model.currency.asc()).limit(page_size + 1))
+    rows = rollups.all()
+    next_cursor = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_cursor = encode_cursor(last.bucket, last.currency)
+
+    candles = [PriceCandle.model_validate(row, from_attributes=True) for row in rows[:page_size]]
+    return PriceHistoryResponse(
+        product_id=product_id,
+        resolution=resolution,
+        prices=[
+            PricePoint(
+                price=candle.close,
+                currency=candle.currency,
+                timestamp=candle.bucket,
+                last_seen_at=candle.close_at,
+                observations=candle.count,
+            )
+            for candle in candles
+        ],
+        candles=candles,
+        next_cursor=next_cursor,
+    )
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+
+
+@router.get("/prices/{product_id}", response_model=PriceHistoryResponse)
+async def get_prices(
+    request: Request,
+    product_id: int,
+    expand: bool = False,
+    resolution: Literal["raw", "hour", "day"] = "raw",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=settings.price_history_max_page_size),
+    output: Literal["json", "ndjson", "csv"] = Query(default="json", alias="format"),
+    if_none_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    def _load() -> Awaitable[PriceHistoryResponse | StreamingResponse]:
+        return _price_history(session, product_id, expand, resolution, since, until, cursor, limit, output)
+
+    if output != "json" or not settings.price_cache_enabled:
+        return await _load()
+
+    cache = get_price_cache()
+    try:
+        entry = await cache.lookup(product_id, cache.fingerprint(request.query_params.multi_items()))
+    except RedisError as exc:
+        logger.warning("price_cache_lookup_failed product_id=%s err=%s", product_id, str(exc))
+        return await _load()
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, entry.etag):
+        await cache.record("not_modified")
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if entry.body is not None:
+        await cache.record("hits")
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    history = await _load()
+    body = history.model_dump_json()
+    await cache.store(entry, body)
+    await cache.record("misses")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _price_history(
+    session: AsyncSession,
+    product_id: int,
+    expand: bool,
+    resolution: Literal["raw", "hour", "day"],
+    since: datetime | None,
+    until: datetime | None,
+    cursor: str | None,
+    limit: int | None,
+    output: Literal["json", "ndjson", "csv"],
+) -> PriceHistoryResponse | StreamingResponse:
+    product = await session.scalar(select(Product.id).where(Product.id == product_id))
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+
+    since, until = as_utc(since), as_utc(until)
+    page_size = limit or settings.price_history_page_size
+
+    if resolution != "raw":
+        if output != "json":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Streaming formats require resolution=raw",
+            )
+        return await _get_candles(session, product_id, resolution, since, until, cursor, page_size)
+
+    stmt = select(
+        PriceRecord.id,
+        PriceRecord.timestamp,
+        PriceRecord.price,
+        PriceRecord.currency,
+        PriceRecord.last_seen_at,
+        PriceRecord.observations,
+    ).where(PriceRecord.product_id == product_id)
+    if since is not None:
+        stmt = stmt.where(PriceRecord.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(PriceRecord.timestamp < until)
+
+    position = _cursor_position(cursor, int)
+    if position is not None:
+        stmt = stmt.where(PriceRecord.timestamp >= position[0]).where(
+            tuple_(PriceRecord.timestamp, PriceRecord.id) > tuple_(literal(position[0]), literal(position[1]))
+        )
+    stmt = stmt.order_by(PriceRecord.timestamp.asc(), PriceRecord.id.asc())
+
+    if output != "json":
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return StreamingResponse(stream_price_rows(stmt, output, expand), media_type=STREAM_MEDIA_TYPES[output])
+
+    result = await session.execute(stmt.limit(page_size + 1))
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_cursor = encode_cursor(last.timestamp, last.id)
+
+    prices: list[PricePoint] = []
+    for row in rows[:page_size]:
+        if expand:
+            prices.extend(_expand_run(row))
+        else:
+            prices.append(
+                PricePoint(
+                    price=row.price,
+                    currency=row.currency,
+                    timestamp=row.timestamp,
+                    last_seen_at=row.last_seen_at,
+                    observations=row.observations,
+                )
+            )
+
+    return PriceHistoryResponse(product_id=product_id, prices=prices, next_cursor=next_cursor)
+
+
+@router.get("/events/prices")
+async def price_events(
+    request: Request,
+    product_id: list[int] | None = Query(default=None),
+    last_event_id: str | None = Header(default=None),
+) -> StreamingResponse:
+    if last_event_id is not None and not valid_event_id(last_event_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Last-Event-ID")
+    return StreamingResponse(
+        price_event_stream(product_id or [], last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats/selector-cache")
+async def selector_cache_stats() -> dict:
+    return await get_selector_cache().stats()
+
+
+@router.get("/stats/price-cache")
+async def price_cache_stats() -> dict:
+    return await get_price_cache().stats()
+
+
+@router.get("/stats/conditional")
+async def conditional_fetch_stats() -> dict:
+    return await get_conditional_store().stats()
+
+
+@router.get("/stats/price-writer")
+async def price_writer_stats_endpoint() -> dict:
+    return await price_writer_stats()
+
+
+@router.get("/stats/inflight")
+async def inflight_stats() -> dict:
+    return await get_inflight_registry().stats()
+
+
+@router.get("/circuit-breakers", response_model=list[CircuitBreakerState])
+async def list_circuit_breakers() -> list[CircuitBreakerState]:
+    return [CircuitBreakerState(**state) for state in await get_circuit_breaker().states()]
+
+
+@router.get("/circuit-breakers/{domain}", response_model=CircuitBreakerState)
+async def get_circuit_breaker_state(domain: str) -> CircuitBreakerState:
+    return CircuitBreakerState(**await get_circuit_breaker().state(domain.lower()))
+
+
+@router.post("/circuit-breakers/{domain}/reset", response_model=CircuitBreakerState)
+async def reset_circuit_breaker_state(domain: str) -> CircuitBreakerState:
+    breaker = get_circuit_breaker()
+    await breaker.reset(domain.lower())
+    return CircuitBreakerState(**await breaker.state(domain.lower()))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    update_db_pool_metrics(engine.pool)
+    await asyncio.to_thread(update_queue_depth_metrics)
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
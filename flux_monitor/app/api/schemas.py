@@ -2,27 +2,93 @@ from __future__ import annotations
 
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 
 
 class TrackRequest(BaseModel):
     url: HttpUrl
     name: str | None = None
     price_selector: str | None = None
+    scrape_interval_s: int | None = Field(default=None, ge=60)
 
 
 class TrackResponse(BaseModel):
     product_id: int
     task_id: str | None
+    duplicate: bool = False
+
+
+class BulkTrackRequest(BaseModel):
+    items: list[TrackRequest] = Field(min_length=1)
+    scrape_existing: bool = False
+
+
+class BulkTrackItem(BaseModel):
+    url: str
+    product_id: int
+    created: bool
+
+
+class BulkTrackResponse(BaseModel):
+    items: list[BulkTrackItem]
+    created: int
+    dispatched: int
+    duplicates: int = 0
+    group_id: str | None
+
+
+class ScheduleUpdate(BaseModel):
+    interval_override_s: int | None = Field(default=None, ge=60)
+
+
+class ScheduleResponse(BaseModel):
+    product_id: int
+    interval_s: int
+    source: Literal["override", "configured", "adaptive", "default"]
+    reason: str | None
+    scrape_interval_s: int | None
+    adaptive_interval_s: int | None
+    interval_override_s: int | None
+    next_due_at: datetime
+
+
+class CircuitBreakerState(BaseModel):
+    domain: str
+    state: Literal["closed", "open", "half_open"]
+    requests: int
+    failures: int
+    failure_rate: float | None
+    trips: int
+    opened_at: datetime | None
+    open_until: datetime | None
+    last_failure_at: datetime | None
 
 
 class PricePoint(BaseModel):
     price: Decimal
     currency: str
     timestamp: datetime
+    last_seen_at: datetime | None = None
+    observations: int = 1
+
+
+class PriceCandle(BaseModel):
+    bucket: datetime
+    currency: str
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    count: int
+    open_at: datetime
+    close_at: datetime
 
 
 class PriceHistoryResponse(BaseModel):
     product_id: int
+    resolution: Literal["raw", "hour", "day"] = "raw"
     prices: list[PricePoint]
+    candles: list[PriceCandle] = []
+    next_cursor: str | None = None
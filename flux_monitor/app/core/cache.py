@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from app.core.redis import get_async_redis
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_VERSION_KEY = "flux:prices:version:{}"
+_ENTRY_KEY = "flux:prices:cache:{}:{}:{}"
+_STATS_KEY = "flux:prices:cache:stats"
+
+
+@dataclass(frozen=True)
+class CachedHistory:
+    product_id: int
+    version: int
+    fingerprint: str
+    body: str | None
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.product_id}-{self.version}-{self.fingerprint}"'
+
+    @property
+    def key(self) -> str:
+        return _ENTRY_KEY.format(self.product_id, self.version, self.fingerprint)
+
+
+class PriceHistoryCache:
+    def __init__(self, ttl_s: int) -> None:
+        self._ttl_s = ttl_s
+
+    @staticmethod
+    def fingerprint(params: Iterable[tuple[str, str]]) -> str:
+        canonical = "&".join(f"{key}={value}" for key, value in sorted(params))
+        return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+    async def lookup(self, product_id: int, fingerprint: str) -> CachedHistory:
+        redis = get_async_redis()
+        version = int(await redis.get(_VERSION_KEY.format(product_id)) or 0)
+        entry = CachedHistory(product_id=product_id, version=version, fingerprint=fingerprint, body=None)
+        return replace(entry, body=await redis.get(entry.key))
+
+    async def store(self, entry: CachedHistory, body: str) -> None:
+        try:
+            await get_async_redis().set(entry.key, body, ex=self._ttl_s)
+        except RedisError as exc:
+            logger.warning("price_cache_store_failed product_id=%s err=%s", entry.product_id, str(exc))
+
+    async def record(self, outcome: str) -> None:
+        try:
+            await get_async_redis().hincrby(_STATS_KEY, outcome, 1)
+        except RedisError:
+            pass
+
+    async def invalidate(self, product_ids: Iterable[int]) -> None:
+        pipe = get_async_redis().pipeline(transaction=False)
+        for product_id in sorted(set(product_ids)):
+            pipe.incr(_VERSION_KEY.format(product_id))
+        await pipe.execute()
+
+    async def stats(self) -> dict[str, Any]:
+        raw = await get_async_redis().hgetall(_STATS_KEY)
+        stats: dict[str, Any] = {key: int(value) for key, value in raw.items()}
+
+        hits = stats.get("hits", 0) + stats.get("not_modified", 0)
+        lookups = hits + stats.get("misses", 0)
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else None
+        stats["enabled"] = settings.price_cache_enabled
+        return stats
+
+
+_cache: PriceHistoryCache | None = None
+
+
+def get_price_cache() -> PriceHistoryCache:
+    global _cache
+    if _cache is None:
+        _cache = PriceHistoryCache(ttl_s=settings.price_cache_ttl_s)
+    return _cache
+
+
+async def invalidate_price_history(product_ids: Iterable[int]) -> None:
+    try:
+        await get_price_cache().invalidate(product_ids)
+    except RedisError as exc:
+        logger.warning("price_cache_invalidate_failed err=%s", str(exc))
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass
 
 from celery import Celery
+from kombu import Queue
+from kombu.exceptions import ChannelError
 
 from app.core.settings import settings
 
@@ -16,25 +19,137 @@ celery_app = Celery(
     "flux_monitor",
     broker=broker_url,
     backend=result_backend,
-    include=["app.tasks.scrape", "app.tasks.schedule"],
+    include=[
+        "app.tasks.scrape",
+        "app.tasks.schedule",
+        "app.tasks.persist",
+        "app.tasks.maintenance",
+        "app.tasks.adaptive",
+    ],
 )
 
+QUEUE_BROWSER = "scrape_browser"
+QUEUE_HTTP = "scrape_http"
+QUEUE_PERSIST = "persist"
+QUEUE_SCHEDULE = "schedule"
+
+SCRAPE_QUEUES = (QUEUE_HTTP, QUEUE_BROWSER)
+
+
+@dataclass(frozen=True)
+class QueueProfile:
+    concurrency: int
+    prefetch_multiplier: int
+    time_limit_s: int
+
+    @property
+    def soft_time_limit_s(self) -> int:
+        return max(1, self.time_limit_s - 30)
+
+
+QUEUE_PROFILES = {
+    QUEUE_BROWSER: QueueProfile(
+        concurrency=settings.queue_browser_concurrency,
+        prefetch_multiplier=settings.queue_browser_prefetch,
+        time_limit_s=settings.queue_browser_time_limit_s,
+    ),
+    QUEUE_HTTP: QueueProfile(
+        concurrency=settings.queue_http_concurrency,
+        prefetch_multiplier=settings.queue_http_prefetch,
+        time_limit_s=settings.queue_http_time_limit_s,
+    ),
+    QUEUE_PERSIST: QueueProfile(
+        concurrency=settings.queue_persist_concurrency,
+        prefetch_multiplier=settings.queue_persist_prefetch,
+        time_limit_s=settings.queue_persist_time_limit_s,
+    ),
+    QUEUE_SCHEDULE: QueueProfile(
+        concurrency=settings.queue_schedule_concurrency,
+        prefetch_multiplier=settings.queue_schedule_prefetch,
+        time_limit_s=settings.queue_schedule_time_limit_s,
+    ),
+}
+
+# Scrapes start on the HTTP queue and are forwarded to the browser queue only when a page needs Chromium.
+task_routes = {
+    "flux_monitor.scrape_product": {"queue": QUEUE_HTTP},
+    "flux_monitor.scrape_batch": {"queue": QUEUE_HTTP},
+    "flux_monitor.flush_prices": {"queue": QUEUE_PERSIST},
+    "flux_monitor.maintain_partitions": {"queue": QUEUE_PERSIST},
+    "flux_monitor.adapt_intervals": {"queue": QUEUE_PERSIST},
+    "flux_monitor.dispatch_due_products": {"queue": QUEUE_SCHEDULE},
+    "flux_monitor.scrape_all_products": {"queue": QUEUE_SCHEDULE},
+}
+
+
+def browser_enabled() -> bool:
+    return settings.worker_queue in (None, QUEUE_BROWSER)
+
+
+def scrape_time_limit_s() -> int:
+    return max(QUEUE_PROFILES[queue].time_limit_s for queue in SCRAPE_QUEUES)
+
+
+def queue_depths() -> dict[str, int]:
+    depths: dict[str, int] = {}
+    with celery_app.connection_for_read() as conn:
+        channel = conn.default_channel
+        for queue in QUEUE_PROFILES:
+            try:
+                depths[queue] = channel.queue_declare(queue=queue, passive=True).message_count
+            except ChannelError:
+                # The Redis transport reports an empty queue as missing.
+                depths[queue] = 0
+    return depths
+
+
+beat_schedule = {
+    "dispatch-due-products": {
+        "task": "flux_monitor.dispatch_due_products",
+        "schedule": settings.scheduler_tick_s,
+    },
+    "maintain-price-partitions": {
+        "task": "flux_monitor.maintain_partitions",
+        "schedule": settings.partition_maintenance_interval_s,
+    },
+}
+
+if settings.adaptive_intervals_enabled:
+    beat_schedule["adapt-scrape-intervals"] = {
+        "task": "flux_monitor.adapt_intervals",
+        "schedule": settings.adaptive_tick_s,
+    }
+
+if settings.price_write_mode == "buffered":
+    beat_schedule["flush-price-buffer"] = {
+        "task": "flux_monitor.flush_prices",
+        "schedule": settings.price_flush_interval_s,
+    }
+
 celery_app.conf.update(
     task_acks_late=True,
     worker_prefetch_multiplier=1,
     task_track_started=True,
     task_time_limit=300,
     task_soft_time_limit=270,
+    task_queues=[Queue(queue) for queue in QUEUE_PROFILES],
+    task_default_queue=QUEUE_PERSIST,
+    task_routes=task_routes,
     broker_connection_retry_on_startup=True,
     worker_hijack_root_logger=False,
-    beat_schedule={
-        "scrape-all-products-hourly": {
-            "task": "flux_monitor.scrape_all_products",
-            "schedule": 3600.0,
-        }
-    },
+    worker_proc_alive_timeout=60.0,
+    beat_schedule=beat_schedule,
 )
 
+if settings.worker_queue:
+    profile = QUEUE_PROFILES[settings.worker_queue]
+    celery_app.conf.update(
+        worker_concurrency=profile.concurrency,
+        worker_prefetch_multiplier=profile.prefetch_multiplier,
+        task_time_limit=profile.time_limit_s,
+        task_soft_time_limit=profile.soft_time_limit_s,
+    )
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s %(name)s %(message)s",
@@ -1,14 +1,40 @@
 from __future__ import annotations
 
+import time
 from collections.abc import AsyncGenerator
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app.core.metrics import DB_POOL_CHECKOUT_SECONDS, update_db_pool_metrics
 from app.core.settings import settings
 
 
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+            update_db_pool_metrics(self)
+
+    def _do_return_conn(self, record: Any) -> None:
+        super()._do_return_conn(record)
+        update_db_pool_metrics(self)
+
+
 def create_engine() -> AsyncEngine:
-    return create_async_engine(settings.database_url, pool_pre_ping=True)
+    return create_async_engine(
+        settings.database_url,
+        poolclass=TimedAsyncQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_s,
+        pool_recycle=settings.db_pool_recycle_s,
+        pool_pre_ping=True,
+    )
 
 
 engine: AsyncEngine = create_engine()
@@ -19,6 +45,16 @@ async_session_maker: async_sessionmaker[AsyncSession] = async_sessionmaker(
 )
 
 
+def forget_inherited_connections() -> None:
+    # After a fork the pool may hold the parent's connections; drop them without closing
+    # the sockets the parent still uses, so this process opens its own on its own loop.
+    engine.sync_engine.dispose(close=False)
+
+
+async def dispose_engine() -> None:
+    await engine.dispose()
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
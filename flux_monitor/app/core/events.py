@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from collections.abc import AsyncIterator, Collection, Iterable
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from app.core.redis import get_async_redis
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+PRICE_EVENTS_STREAM = "flux:price_events"
+
+_EVENT_ID = re.compile(r"\d{1,20}(-\d{1,20})?")
+
+
+async def publish_price_events(events: Iterable[dict[str, str]]) -> None:
+    try:
+        pipe = get_async_redis().pipeline(transaction=False)
+        for fields in events:
+            pipe.xadd(PRICE_EVENTS_STREAM, fields, maxlen=settings.price_events_maxlen, approximate=True)
+        await pipe.execute()
+    except RedisError as exc:
+        logger.warning("price_events_publish_failed err=%s", str(exc))
+
+
+def valid_event_id(event_id: str) -> bool:
+    return _EVENT_ID.fullmatch(event_id) is not None
+
+
+def _format_sse(event_id: str, fields: dict[str, Any]) -> str:
+    return f"id: {event_id}\nevent: price\ndata: {json.dumps(fields, separators=(',', ':'))}\n\n"
+
+
+async def price_event_stream(
+    product_ids: Collection[int],
+    last_event_id: str | None,
+    is_disconnected: Any,
+) -> AsyncIterator[str]:
+    redis = get_async_redis()
+    cursor = last_event_id or "$"
+    wanted = {str(product_id) for product_id in product_ids}
+
+    yield f"retry: {settings.price_events_retry_ms}\n\n"
+    while not await is_disconnected():
+        try:
+            response = await redis.xread(
+                {PRICE_EVENTS_STREAM: cursor},
+                count=settings.price_events_batch_size,
+                block=settings.price_events_keepalive_s * 1000,
+            )
+        except RedisError as exc:
+            # End the response; the client reconnects after the retry delay and resumes from its Last-Event-ID.
+            logger.warning("price_events_stream_failed cursor=%s err=%s", cursor, str(exc))
+            return
+        if not response:
+            yield ": keepalive\n\n"
+            continue
+
+        for event_id, fields in response[0][1]:
+            cursor = event_id
+            if not wanted or fields.get("product_id") in wanted:
+                yield _format_sse(event_id, fields)
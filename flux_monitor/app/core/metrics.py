@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any
+
+from celery.signals import before_task_publish, task_prerun, worker_init, worker_process_shutdown
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from sqlalchemy.pool import Pool
+
+from app.core.celery_app import queue_depths
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+PUBLISHED_AT_HEADER = "flux_published_at"
+
+_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+_PHASE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 45.0, 90.0)
+_QUEUE_BUCKETS = (0.05, 0.25, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+SCRAPE_PHASE_SECONDS = Histogram(
+    "flux_scrape_phase_seconds",
+    "Time spent in each scrape phase.",
+    ["phase", "domain", "outcome"],
+    buckets=_PHASE_BUCKETS,
+)
+SCRAPE_SECONDS = Histogram(
+    "flux_scrape_seconds",
+    "End-to-end time to scrape and record one product.",
+    ["domain", "outcome"],
+    buckets=_PHASE_BUCKETS,
+)
+SCRAPES_TOTAL = Counter(
+    "flux_scrapes_total",
+    "Scrape attempts by outcome.",
+    ["domain", "outcome"],
+)
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "flux_task_queue_wait_seconds",
+    "Time between a task being published and a worker starting it.",
+    ["task"],
+    buckets=_QUEUE_BUCKETS,
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "flux_http_request_duration_seconds",
+    "API request latency until the response headers are sent.",
+    ["method", "route", "status"],
+)
+CIRCUIT_BREAKER_TRANSITIONS = Counter(
+    "flux_circuit_breaker_transitions_total",
+    "Circuit breaker state changes per domain.",
+    ["domain", "state"],
+)
+CIRCUIT_BREAKER_REJECTIONS = Counter(
+    "flux_circuit_breaker_rejections_total",
+    "Scrapes skipped or deferred because the domain's circuit breaker was open.",
+    ["domain"],
+)
+DUPLICATE_DISPATCHES_SUPPRESSED = Counter(
+    "flux_dispatch_duplicates_suppressed_total",
+    "Scrape dispatches dropped because the product already had a queued or running task.",
+    ["source"],
+)
+QUEUE_DEPTH = Gauge(
+    "flux_queue_depth",
+    "Messages waiting in each Celery queue.",
+    ["queue"],
+    multiprocess_mode="mostrecent",
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "flux_db_pool_checkout_seconds",
+    "Time to check a connection out of the SQLAlchemy pool, including connecting.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "flux_db_pool_connections",
+    "Connections in the SQLAlchemy pool by state.",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+
+def observe_scrape(domain: str, outcome: str, elapsed_s: float, phases: dict[str, float]) -> None:
+    if not settings.metrics_enabled:
+        return
+
+    domain = domain or "unknown"
+    SCRAPES_TOTAL.labels(domain, outcome).inc()
+    SCRAPE_SECONDS.labels(domain, outcome).observe(elapsed_s)
+    for name, elapsed_ms in phases.items():
+        SCRAPE_PHASE_SECONDS.labels(name, domain, outcome).observe(elapsed_ms / 1000)
+
+
+def observe_http_request(method: str, route: str, status: int, elapsed_s: float) -> None:
+    if settings.metrics_enabled:
+        HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(elapsed_s)
+
+
+def update_db_pool_metrics(pool: Pool) -> None:
+    for state, read in (
+        ("size", "size"),
+        ("checked_out", "checkedout"),
+        ("checked_in", "checkedin"),
+        ("overflow", "overflow"),
+    ):
+        reader = getattr(pool, read, None)
+        if reader is not None:
+            DB_POOL_CONNECTIONS.labels(state).set(reader())
+
+
+def update_queue_depth_metrics() -> None:
+    try:
+        depths = queue_depths()
+    except Exception as exc:
+        logger.warning("queue_depth_unavailable err=%s", str(exc))
+        return
+    for queue, depth in depths.items():
+        QUEUE_DEPTH.labels(queue).set(depth)
+
+
+def metrics_payload() -> tuple[bytes, str]:
+    registry = REGISTRY
+    if _MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+@before_task_publish.connect
+def _stamp_published_at(headers: dict[str, Any] | None = None, **_: object) -> None:
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def _observe_queue_wait(task: Any = None, **_: object) -> None:
+    if not settings.metrics_enabled or task is None:
+        return
+
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None)
+    if published_at is None:
+        published_at = (task.request.headers or {}).get(PUBLISHED_AT_HEADER)
+    if published_at is None:
+        return
+
+    ready_at = float(published_at)
+    eta = getattr(task.request, "eta", None)
+    if eta:
+        # A countdown/eta delay is intentional; only time spent waiting after it counts.
+        ready_at = max(ready_at, (datetime.fromisoformat(eta) if isinstance(eta, str) else eta).timestamp())
+    TASK_QUEUE_WAIT_SECONDS.labels(task.name).observe(max(0.0, time.time() - ready_at))
+
+
+@worker_init.connect
+def _start_worker_exporter(**_: object) -> None:
+    if not settings.metrics_enabled or settings.metrics_worker_port <= 0:
+        return
+
+    registry = REGISTRY
+    if _MULTIPROC_DIR:
+        # Prefork children write their samples here; docker-entrypoint.sh creates and empties it before start.
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    start_http_server(settings.metrics_worker_port, registry=registry)
+    logger.info("metrics_exporter_started port=%s multiprocess=%s", settings.metrics_worker_port, bool(_MULTIPROC_DIR))
+
+
+@worker_process_shutdown.connect
+def _mark_worker_process_dead(pid: int | None = None, **_: object) -> None:
+    if _MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid or os.getpid())
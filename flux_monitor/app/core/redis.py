@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.settings import settings
+
+
+_client: redis.Redis | None = None
+_async_client: aioredis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _client
+
+
+def get_async_redis() -> aioredis.Redis:
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _async_client
+
+
+async def close_async_redis() -> None:
+    global _async_client
+    if _async_client is not None:
+        client, _async_client = _async_client, None
+        await client.aclose()
+
+
+def reset_redis() -> None:
+    global _client, _async_client
+    _client = None
+    _async_client = None
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Coroutine
+from typing import Any, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_shutdown_hooks: list[Callable[[], Awaitable[None]]] = []
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def start() -> asyncio.AbstractEventLoop:
+    # A forked worker child inherits the parent's loop and hooks; neither belongs to it.
+    global _loop
+    _loop = None
+    _shutdown_hooks.clear()
+    return get_loop()
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    loop = get_loop()
+    existing = asyncio.all_tasks(loop)
+    try:
+        return loop.run_until_complete(coro)
+    except BaseException:
+        # Tasks this call spawned (gather children, or the call itself when a time limit
+        # interrupts it) would otherwise resume inside whatever runs on the loop next.
+        _cancel_pending(loop, asyncio.all_tasks(loop) - existing)
+        raise
+
+
+def _cancel_pending(loop: asyncio.AbstractEventLoop, tasks: set[asyncio.Task[Any]]) -> None:
+    if not tasks:
+        return
+    for task in tasks:
+        task.cancel()
+    results = loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    for task, result in zip(tasks, results):
+        if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
+            logger.warning("runtime_task_failed_on_cancel task=%s err=%s", task.get_name(), str(result))
+
+
+def on_shutdown(hook: Callable[[], Awaitable[None]]) -> None:
+    if hook not in _shutdown_hooks:
+        _shutdown_hooks.append(hook)
+
+
+def shutdown() -> None:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+
+    try:
+        for hook in reversed(_shutdown_hooks):
+            try:
+                _loop.run_until_complete(hook())
+            except Exception:
+                logger.exception("runtime_shutdown_hook_failed hook=%s", getattr(hook, "__qualname__", hook))
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+    finally:
+        _loop.close()
+        _loop = None
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,5 +14,125 @@ class Settings(BaseSettings):
     celery_broker_url: str | None = Field(default=None, validation_alias="CELERY_BROKER_URL")
     celery_result_backend: str | None = Field(default=None, validation_alias="CELERY_RESULT_BACKEND")
 
+    worker_queue: Literal["scrape_browser", "scrape_http", "persist", "schedule"] | None = Field(
+        default=None,
+        validation_alias="WORKER_QUEUE",
+    )
+    queue_browser_concurrency: int = Field(default=2, validation_alias="QUEUE_BROWSER_CONCURRENCY")
+    queue_browser_prefetch: int = Field(default=1, validation_alias="QUEUE_BROWSER_PREFETCH")
+    queue_browser_time_limit_s: int = Field(default=300, validation_alias="QUEUE_BROWSER_TIME_LIMIT_S")
+    queue_http_concurrency: int = Field(default=8, validation_alias="QUEUE_HTTP_CONCURRENCY")
+    queue_http_prefetch: int = Field(default=4, validation_alias="QUEUE_HTTP_PREFETCH")
+    queue_http_time_limit_s: int = Field(default=120, validation_alias="QUEUE_HTTP_TIME_LIMIT_S")
+    queue_persist_concurrency: int = Field(default=2, validation_alias="QUEUE_PERSIST_CONCURRENCY")
+    queue_persist_prefetch: int = Field(default=4, validation_alias="QUEUE_PERSIST_PREFETCH")
+    queue_persist_time_limit_s: int = Field(default=600, validation_alias="QUEUE_PERSIST_TIME_LIMIT_S")
+    queue_schedule_concurrency: int = Field(default=1, validation_alias="QUEUE_SCHEDULE_CONCURRENCY")
+    queue_schedule_prefetch: int = Field(default=4, validation_alias="QUEUE_SCHEDULE_PREFETCH")
+    queue_schedule_time_limit_s: int = Field(default=120, validation_alias="QUEUE_SCHEDULE_TIME_LIMIT_S")
+
+    db_pool_size: int = Field(default=5, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_s: float = Field(default=30.0, validation_alias="DB_POOL_TIMEOUT_S")
+    db_pool_recycle_s: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE_S")
+
+    browser_pool_size: int = Field(default=2, validation_alias="BROWSER_POOL_SIZE")
+    browser_max_pages: int = Field(default=200, validation_alias="BROWSER_MAX_PAGES")
+    browser_max_memory_mb: int = Field(default=1024, validation_alias="BROWSER_MAX_MEMORY_MB")
+    browser_pool_stats_log_every: int = Field(default=100, validation_alias="BROWSER_POOL_STATS_LOG_EVERY")
+
+    scrape_batch_size: int = Field(default=50, validation_alias="SCRAPE_BATCH_SIZE")
+    scrape_batch_concurrency: int = Field(default=8, validation_alias="SCRAPE_BATCH_CONCURRENCY")
+    scrape_interval_default_s: int = Field(default=3600, validation_alias="SCRAPE_INTERVAL_DEFAULT_S")
+    scrape_interval_min_s: int = Field(default=300, validation_alias="SCRAPE_INTERVAL_MIN_S")
+    scrape_interval_max_s: int = Field(default=86400, validation_alias="SCRAPE_INTERVAL_MAX_S")
+    adaptive_intervals_enabled: bool = Field(default=True, validation_alias="ADAPTIVE_INTERVALS_ENABLED")
+    adaptive_tick_s: float = Field(default=3600.0, validation_alias="ADAPTIVE_TICK_S")
+    adaptive_window_s: int = Field(default=7 * 86400, validation_alias="ADAPTIVE_WINDOW_S")
+    adaptive_min_samples: int = Field(default=6, validation_alias="ADAPTIVE_MIN_SAMPLES")
+    adaptive_samples_per_change: float = Field(default=4.0, validation_alias="ADAPTIVE_SAMPLES_PER_CHANGE")
+    scheduler_tick_s: float = Field(default=30.0, validation_alias="SCHEDULER_TICK_S")
+    scheduler_claim_chunk_size: int = Field(default=500, validation_alias="SCHEDULER_CLAIM_CHUNK_SIZE")
+    scheduler_max_claims_per_tick: int = Field(default=10_000, validation_alias="SCHEDULER_MAX_CLAIMS_PER_TICK")
+
+    rate_limit_enabled: bool = Field(default=True, validation_alias="RATE_LIMIT_ENABLED")
+    rate_limit_default_rps: float = Field(default=1.0, validation_alias="RATE_LIMIT_DEFAULT_RPS")
+    rate_limit_burst: int = Field(default=2, validation_alias="RATE_LIMIT_BURST")
+    rate_limit_max_wait_s: float = Field(default=30.0, validation_alias="RATE_LIMIT_MAX_WAIT_S")
+    rate_limit_overrides: dict[str, float] = Field(default_factory=dict, validation_alias="RATE_LIMIT_OVERRIDES")
+
+    circuit_breaker_enabled: bool = Field(default=True, validation_alias="CIRCUIT_BREAKER_ENABLED")
+    circuit_breaker_window_s: float = Field(default=300.0, validation_alias="CIRCUIT_BREAKER_WINDOW_S")
+    circuit_breaker_min_requests: int = Field(default=10, validation_alias="CIRCUIT_BREAKER_MIN_REQUESTS")
+    circuit_breaker_failure_rate: float = Field(default=0.5, validation_alias="CIRCUIT_BREAKER_FAILURE_RATE")
+    circuit_breaker_open_s: float = Field(default=60.0, validation_alias="CIRCUIT_BREAKER_OPEN_S")
+    circuit_breaker_max_open_s: float = Field(default=1800.0, validation_alias="CIRCUIT_BREAKER_MAX_OPEN_S")
+    circuit_breaker_probe_timeout_s: float = Field(default=90.0, validation_alias="CIRCUIT_BREAKER_PROBE_TIMEOUT_S")
+    circuit_breaker_open_action: Literal["defer", "skip"] = Field(
+        default="defer",
+        validation_alias="CIRCUIT_BREAKER_OPEN_ACTION",
+    )
+
+    inflight_dedupe_enabled: bool = Field(default=True, validation_alias="INFLIGHT_DEDUPE_ENABLED")
+    inflight_queue_grace_s: int = Field(default=900, validation_alias="INFLIGHT_QUEUE_GRACE_S")
+
+    static_fetch_enabled: bool = Field(default=True, validation_alias="STATIC_FETCH_ENABLED")
+    static_fetch_timeout_s: float = Field(default=15.0, validation_alias="STATIC_FETCH_TIMEOUT_S")
+    static_fetch_max_connections: int = Field(default=50, validation_alias="STATIC_FETCH_MAX_CONNECTIONS")
+    static_fetch_max_chars: int = Field(default=2_000_000, validation_alias="STATIC_FETCH_MAX_CHARS")
+    fetch_strategy_ttl_s: int = Field(default=86400, validation_alias="FETCH_STRATEGY_TTL_S")
+    fetch_strategy_browser_min_products: int = Field(default=3, validation_alias="FETCH_STRATEGY_BROWSER_MIN_PRODUCTS")
+    conditional_fetch_enabled: bool = Field(default=True, validation_alias="CONDITIONAL_FETCH_ENABLED")
+    conditional_browser_preflight: bool = Field(default=False, validation_alias="CONDITIONAL_BROWSER_PREFLIGHT")
+    conditional_state_ttl_s: int = Field(default=7 * 86400, validation_alias="CONDITIONAL_STATE_TTL_S")
+    selector_cache_ttl_s: int = Field(default=30 * 86400, validation_alias="SELECTOR_CACHE_TTL_S")
+    price_wait_timeout_ms: int = Field(default=3000, validation_alias="PRICE_WAIT_TIMEOUT_MS")
+
+    price_storage_mode: Literal["full", "change_only"] = Field(default="full", validation_alias="PRICE_STORAGE_MODE")
+    price_write_mode: Literal["direct", "buffered"] = Field(default="direct", validation_alias="PRICE_WRITE_MODE")
+    price_flush_batch_size: int = Field(default=1000, validation_alias="PRICE_FLUSH_BATCH_SIZE")
+    price_flush_interval_s: float = Field(default=5.0, validation_alias="PRICE_FLUSH_INTERVAL_S")
+    price_flush_max_batches: int = Field(default=50, validation_alias="PRICE_FLUSH_MAX_BATCHES")
+    price_buffer_claim_idle_s: float = Field(default=60.0, validation_alias="PRICE_BUFFER_CLAIM_IDLE_S")
+    price_buffer_max_deliveries: int = Field(default=10, validation_alias="PRICE_BUFFER_MAX_DELIVERIES")
+    price_dead_letter_maxlen: int = Field(default=10_000, validation_alias="PRICE_DEAD_LETTER_MAXLEN")
+    bulk_track_max_items: int = Field(default=50_000, validation_alias="BULK_TRACK_MAX_ITEMS")
+    bulk_track_chunk_size: int = Field(default=1000, validation_alias="BULK_TRACK_CHUNK_SIZE")
+
+    price_history_page_size: int = Field(default=1000, validation_alias="PRICE_HISTORY_PAGE_SIZE")
+    price_history_max_page_size: int = Field(default=10000, validation_alias="PRICE_HISTORY_MAX_PAGE_SIZE")
+    price_stream_chunk_size: int = Field(default=1000, validation_alias="PRICE_STREAM_CHUNK_SIZE")
+    price_cache_enabled: bool = Field(default=True, validation_alias="PRICE_CACHE_ENABLED")
+    price_cache_ttl_s: int = Field(default=3600, validation_alias="PRICE_CACHE_TTL_S")
+    price_events_maxlen: int = Field(default=100_000, validation_alias="PRICE_EVENTS_MAXLEN")
+    price_events_batch_size: int = Field(default=500, validation_alias="PRICE_EVENTS_BATCH_SIZE")
+    price_events_keepalive_s: int = Field(default=15, validation_alias="PRICE_EVENTS_KEEPALIVE_S")
+    price_events_retry_ms: int = Field(default=3000, validation_alias="PRICE_EVENTS_RETRY_MS")
+    price_rollups_enabled: bool = Field(default=True, validation_alias="PRICE_ROLLUPS_ENABLED")
+    price_partition_months_ahead: int = Field(default=3, validation_alias="PRICE_PARTITION_MONTHS_AHEAD")
+    price_retention_months: int = Field(default=0, validation_alias="PRICE_RETENTION_MONTHS")
+    partition_maintenance_interval_s: float = Field(
+        default=86400.0,
+        validation_alias="PARTITION_MAINTENANCE_INTERVAL_S",
+    )
+
+    metrics_enabled: bool = Field(default=True, validation_alias="METRICS_ENABLED")
+    metrics_worker_port: int = Field(default=9808, validation_alias="METRICS_WORKER_PORT")
+
+    resource_blocking_enabled: bool = Field(default=True, validation_alias="RESOURCE_BLOCKING_ENABLED")
+    resource_block_types: list[str] = Field(
+        default_factory=lambda: ["image", "media", "font", "stylesheet"],
+        validation_alias="RESOURCE_BLOCK_TYPES",
+    )
+    resource_block_hosts: list[str] = Field(default_factory=list, validation_alias="RESOURCE_BLOCK_HOSTS")
+    resource_allow_types_by_domain: dict[str, list[str]] = Field(
+        default_factory=dict,
+        validation_alias="RESOURCE_ALLOW_TYPES_BY_DOMAIN",
+    )
+    resource_block_types_by_domain: dict[str, list[str]] = Field(
+        default_factory=dict,
+        validation_alias="RESOURCE_BLOCK_TYPES_BY_DOMAIN",
+    )
+
 
 settings = Settings()
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import os
-import time
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urlparse
 
+import numpy as np
 import pandas as pd
+import redis
 import sqlalchemy as sa
 import streamlit as st
 
@@ -30,39 +32,192 @@ def _sync_db_url_from_env() -> str:
     return url
 
 
+_ROLLUP_TABLES = {"hour": "price_rollups_hour", "day": "price_rollups_day"}
+
+_PRICE_EVENTS_STREAM = "flux:price_events"
+
+_HISTORY_TTL_S = int(os.getenv("DASHBOARD_HISTORY_TTL_S", "600"))
+_VERSION_TTL_S = int(os.getenv("DASHBOARD_VERSION_TTL_S", "5"))
+_PRODUCTS_TTL_S = int(os.getenv("DASHBOARD_PRODUCTS_TTL_S", "60"))
+_RAW_WINDOW_DAYS = int(os.getenv("DASHBOARD_RAW_WINDOW_DAYS", "7"))
+_RAW_MAX_ROWS = int(os.getenv("DASHBOARD_RAW_MAX_ROWS", "20000"))
+
+# Raw rows are re-read whenever a product's latest record changes, so only a bounded recent window
+# is read; the row before it is the run (in change_only mode) that covers the window's start.
+# Longer ranges come from the rollup tables.
+_RAW_HISTORY_SQL = sa.text(
+    """
+    SELECT history.*
+    FROM unnest(CAST(:ids AS integer[])) AS ids(product_id)
+    CROSS JOIN LATERAL (
+        (
+            SELECT product_id, timestamp, price, currency, last_seen_at, observations
+            FROM price_records
+            WHERE product_id = ids.product_id AND timestamp >= :since
+            ORDER BY timestamp DESC
+            LIMIT :max_rows
+        )
+        UNION ALL
+        (
+            SELECT product_id, timestamp, price, currency, last_seen_at, observations
+            FROM price_records
+            WHERE product_id = ids.product_id AND timestamp < :since
+            ORDER BY timestamp DESC
+            LIMIT 1
+        )
+    ) AS history
+    ORDER BY history.product_id, history.timestamp ASC
+    """
+)
+
+_VERSIONS_SQL = sa.text(
+    """
+    SELECT ids.product_id, latest.id, latest.last_seen_at, latest.observations
+    FROM unnest(CAST(:ids AS integer[])) AS ids(product_id)
+    LEFT JOIN LATERAL (
+        SELECT id, last_seen_at, observations
+        FROM price_records
+        WHERE product_id = ids.product_id
+        ORDER BY timestamp DESC, id DESC
+        LIMIT 1
+    ) AS latest ON true
+    """
+)
+
+
 @st.cache_resource
 def get_engine() -> sa.Engine:
     return sa.create_engine(_sync_db_url_from_env(), pool_pre_ping=True)
 
 
-def _rerun() -> None:
-    if hasattr(st, "rerun"):
-        st.rerun()
-    if hasattr(st, "experimental_rerun"):
-        st.experimental_rerun()
+@st.cache_resource
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"), decode_responses=True)
 
 
-def main() -> None:
-    st.set_page_config(page_title="FluxMonitor Dashboard", layout="wide")
-    st.title("FluxMonitor — Price Trends")
+@st.cache_data(ttl=_PRODUCTS_TTL_S, show_spinner=False)
+def load_products() -> pd.DataFrame:
+    return pd.read_sql(
+        sa.text("SELECT id, COALESCE(name, url) AS label, url FROM products ORDER BY created_at DESC"),
+        con=get_engine(),
+    )
 
-    auto_refresh = st.toggle("Auto-refresh", value=False)
-    refresh_seconds = st.number_input("Refresh interval (seconds)", min_value=5, max_value=3600, value=30)
 
-    engine = get_engine()
+@st.cache_data(ttl=_VERSION_TTL_S, show_spinner=False)
+def load_versions(product_ids: tuple[int, ...]) -> dict[int, str]:
+    latest = pd.read_sql(_VERSIONS_SQL, con=get_engine(), params={"ids": list(product_ids)})
+    return {
+        int(row.product_id): f"{row.id}:{row.last_seen_at}:{row.observations}"
+        for row in latest.itertuples(index=False)
+    }
 
-    products = pd.read_sql(
-        sa.text("SELECT id, COALESCE(name, url) AS label, url FROM products ORDER BY created_at DESC"),
-        con=engine,
-    )
 
-    if products.empty:
-        st.info("No products tracked yet. Use the API POST /track to add a product.")
-        if auto_refresh:
-            time.sleep(float(refresh_seconds))
-            _rerun()
+@st.cache_data(ttl=_HISTORY_TTL_S, max_entries=256, show_spinner=False)
+def load_history(product_ids: tuple[int, ...], resolution: str, versions: tuple[str, ...]) -> pd.DataFrame:
+    # versions only keys the cache: a new or extended record for any product changes it.
+    if resolution == "raw":
+        history = pd.read_sql(
+            _RAW_HISTORY_SQL,
+            con=get_engine(),
+            params={
+                "ids": list(product_ids),
+                "since": datetime.now(timezone.utc) - timedelta(days=_RAW_WINDOW_DAYS),
+                "max_rows": _RAW_MAX_ROWS,
+            },
+        )
+    else:
+        query = (
+            "SELECT product_id, bucket AS timestamp, open, high, low, close AS price, currency, count "
+            f"FROM {_ROLLUP_TABLES[resolution]} "
+            "WHERE product_id = ANY(CAST(:ids AS integer[])) ORDER BY product_id, bucket ASC"
+        )
+        history = pd.read_sql(sa.text(query), con=get_engine(), params={"ids": list(product_ids)})
+
+    history["timestamp"] = pd.to_datetime(history["timestamp"], utc=True)
+    for column in ("price", "open", "high", "low"):
+        if column in history:
+            history[column] = pd.to_numeric(history[column])
+    if "last_seen_at" in history:
+        history["last_seen_at"] = pd.to_datetime(history["last_seen_at"], utc=True)
+    return history
+
+
+def _expand_runs(prices: pd.DataFrame) -> pd.DataFrame:
+    counts = prices["observations"].fillna(1).clip(lower=1).astype(int).to_numpy()
+    positions = np.repeat(np.arange(len(prices)), counts)
+    steps = np.concatenate([np.arange(count) for count in counts]) if len(counts) else np.array([], dtype=int)
+    divisors = np.maximum(counts - 1, 1)[positions]
+
+    expanded = prices.iloc[positions].reset_index(drop=True)
+    span = expanded["last_seen_at"].fillna(expanded["timestamp"]) - expanded["timestamp"]
+    expanded["timestamp"] = expanded["timestamp"] + span / divisors * steps
+    return expanded[["timestamp", "price", "currency"]]
+
+
+def _lttb(prices: pd.DataFrame, threshold: int) -> pd.DataFrame:
+    size = len(prices)
+    if threshold < 3 or size <= threshold:
+        return prices
+
+    x = prices["timestamp"].astype("int64").to_numpy(dtype=float)
+    y = prices["price"].to_numpy(dtype=float)
+    every = (size - 2) / (threshold - 2)
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, size - 1
+    anchor = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, size)
+
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor]) - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+
+    return prices.iloc[selected]
+
+
+def _watch_for_changes(watched: set[int] | None) -> None:
+    # watched=None reruns on any new price, e.g. while no products are tracked yet.
+    client = get_redis()
+    try:
+        if "events_cursor" not in st.session_state:
+            latest = client.xrevrange(_PRICE_EVENTS_STREAM, count=1)
+            st.session_state["events_cursor"] = latest[0][0] if latest else "0-0"
+        response = client.xread({_PRICE_EVENTS_STREAM: st.session_state["events_cursor"]}, count=1000)
+    except redis.RedisError:
         return
 
+    changed = False
+    for event_id, fields in response[0][1] if response else []:
+        st.session_state["events_cursor"] = event_id
+        changed = changed or watched is None or int(fields.get("product_id", 0)) in watched
+
+    if changed:
+        load_products.clear()
+        load_versions.clear()
+        st.rerun()
+
+
+def _follow_price_events(watched: set[int] | None, refresh_seconds: float) -> None:
+    # Only a non-blocking Redis stream read per tick; the page reruns (and queries Postgres)
+    # only when a watched product actually got a new price.
+    st.fragment(run_every=refresh_seconds)(_watch_for_changes)(watched)
+
+
+def _history_for(product_ids: list[int], resolution: str) -> pd.DataFrame:
+    ids = tuple(sorted(product_ids))
+    versions = load_versions(ids)
+    return load_history(ids, resolution, tuple(versions.get(pid, "") for pid in ids))
+
+
+def _product_view(products: pd.DataFrame, resolution: str, max_points: int) -> set[int]:
     selected_label = st.selectbox("Product", options=products["label"].tolist())
     selected = products.loc[products["label"] == selected_label].iloc[0]
     product_id = int(selected["id"])
@@ -70,24 +225,86 @@ def main() -> None:
     st.caption(f"Product ID: {product_id}")
     st.caption(f"URL: {selected['url']}")
 
-    prices = pd.read_sql(
-        sa.text(
-            "SELECT timestamp, price, currency FROM price_records WHERE product_id = :pid ORDER BY timestamp ASC"
-        ),
-        con=engine,
-        params={"pid": product_id},
+    expand_runs = st.toggle(
+        "Expand run-length records",
+        value=False,
+        disabled=resolution != "raw",
+        help="With change-only storage, unchanged scrapes are folded into one row; expand them back into points.",
     )
 
+    prices = _history_for([product_id], resolution).drop(columns="product_id")
     if prices.empty:
         st.warning("No price records yet for this product. The worker may still be scraping.")
-    else:
-        prices["timestamp"] = pd.to_datetime(prices["timestamp"], utc=True)
-        st.line_chart(prices.set_index("timestamp")["price"], height=420)
-        st.dataframe(prices, use_container_width=True)
+        return {product_id}
+
+    if resolution == "raw" and expand_runs:
+        prices = _expand_runs(prices)
+
+    chart = _lttb(prices, max_points)
+    st.line_chart(chart.set_index("timestamp")["price"], height=420)
+    st.caption(f"Showing {len(chart)} of {len(prices)} points")
+
+    with st.expander("Latest records"):
+        st.dataframe(prices.tail(500).iloc[::-1], use_container_width=True)
+    return {product_id}
+
+
+def _compare_view(products: pd.DataFrame, resolution: str, max_points: int) -> set[int]:
+    labels = st.multiselect("Products to compare", options=products["label"].tolist())
+    if not labels:
+        st.info("Pick two or more products to compare their price trends.")
+        return set()
+
+    chosen = products.loc[products["label"].isin(labels)]
+    label_by_id = dict(zip(chosen["id"].astype(int), chosen["label"]))
+    history = _history_for(list(label_by_id), resolution)
+    if history.empty:
+        st.warning("No price records yet for the selected products.")
+        return set(label_by_id)
+
+    series = [
+        _lttb(frame, max_points).assign(product=label_by_id[int(product_id)])[["timestamp", "price", "product"]]
+        for product_id, frame in history.groupby("product_id", sort=False)
+    ]
+    st.line_chart(pd.concat(series, ignore_index=True), x="timestamp", y="price", color="product", height=420)
+    return set(label_by_id)
+
+
+def main() -> None:
+    st.set_page_config(page_title="FluxMonitor Dashboard", layout="wide")
+    st.title("FluxMonitor — Price Trends")
+
+    live_updates = st.toggle("Live updates", value=False, help="Refresh when the worker stores a new price.")
+    refresh_seconds = st.number_input("Check for new prices every (seconds)", min_value=1, max_value=3600, value=5)
+
+    products = load_products()
+
+    if products.empty:
+        st.info("No products tracked yet. Use the API POST /track to add a product.")
+        if live_updates:
+            _follow_price_events(None, float(refresh_seconds))
+        return
+
+    resolution = st.radio("Resolution", options=["raw", "hour", "day"], index=0, horizontal=True)
+    if resolution == "raw":
+        st.caption(f"Raw shows the last {_RAW_WINDOW_DAYS} days; switch to hour or day for the full history.")
+    max_points = st.slider(
+        "Max chart points",
+        min_value=100,
+        max_value=5000,
+        value=1000,
+        step=100,
+        help="Longer histories are downsampled with LTTB before charting.",
+    )
+
+    product_tab, compare_tab = st.tabs(["Product", "Compare"])
+    with product_tab:
+        watched = _product_view(products, resolution, max_points)
+    with compare_tab:
+        watched |= _compare_view(products, resolution, max_points)
 
-    if auto_refresh:
-        time.sleep(float(refresh_seconds))
-        _rerun()
+    if live_updates:
+        _follow_price_events(watched, float(refresh_seconds))
 
 
 if __name__ == "__main__":
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 
 from app.api.routes import router
+from app.core.db import dispose_engine
+from app.core.metrics import observe_http_request
+from app.core.redis import close_async_redis
 
 
 logging.basicConfig(
@@ -12,5 +18,31 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s %(name)s %(message)s",
 )
 
-app = FastAPI(title="FluxMonitor")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    await close_async_redis()
+    await dispose_engine()
+
+
+app = FastAPI(title="FluxMonitor", lifespan=lifespan)
 app.include_router(router)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        observe_http_request(
+            request.method,
+            getattr(route, "path", "unmatched"),
+            status,
+            time.perf_counter() - started,
+        )
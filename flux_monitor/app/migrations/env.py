@@ -21,6 +21,7 @@ if str(project_root) not in os.sys.path:
 
 from app.models.base import Base  # noqa: E402
 from app.models.price_record import PriceRecord  # noqa: F401,E402
+from app.models.price_rollup import PriceRollupDay, PriceRollupHour  # noqa: F401,E402
 from app.models.product import Product  # noqa: F401,E402
 
 
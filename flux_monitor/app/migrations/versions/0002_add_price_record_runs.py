@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("price_records", sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column(
+        "price_records",
+        sa.Column("observations", sa.Integer(), server_default=sa.text("1"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("price_records", "observations")
+    op.drop_column("price_records", "last_seen_at")
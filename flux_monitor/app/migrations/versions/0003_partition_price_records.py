@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION flux_ensure_price_partitions(from_month date, to_month date)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start date := date_trunc('month', from_month)::date;
+    lower_bound timestamptz;
+    upper_bound timestamptz;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE month_start <= to_month LOOP
+        partition_name := format('price_records_%s', to_char(month_start, 'YYYY_MM'));
+        lower_bound := month_start::timestamp AT TIME ZONE 'UTC';
+        upper_bound := (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+
+        IF to_regclass(partition_name) IS NULL THEN
+            -- Rows that landed in the default partition for this month have to move
+            -- out before the new partition can be attached.
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE price_records INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                partition_name
+            );
+            EXECUTE format(
+                'WITH moved AS ('
+                'DELETE FROM price_records_default WHERE "timestamp" >= %L AND "timestamp" < %L RETURNING *'
+                ') INSERT INTO %I SELECT * FROM moved',
+                lower_bound, upper_bound, partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE price_records ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, lower_bound, upper_bound
+            );
+            created := created + 1;
+        END IF;
+
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+
+    RETURN created;
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE price_records RENAME TO price_records_unpartitioned")
+    op.execute(
+        "ALTER TABLE price_records_unpartitioned "
+        "RENAME CONSTRAINT pk_price_records TO pk_price_records_unpartitioned"
+    )
+    op.execute(
+        "ALTER TABLE price_records_unpartitioned "
+        "RENAME CONSTRAINT fk_price_records_product_id_products TO fk_price_records_unpartitioned_product_id_products"
+    )
+    op.execute("ALTER INDEX ix_price_records_product_id RENAME TO ix_price_records_unpartitioned_product_id")
+    op.execute("ALTER SEQUENCE price_records_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE price_records (
+            id integer NOT NULL DEFAULT nextval('price_records_id_seq'::regclass),
+            product_id integer NOT NULL,
+            price numeric(12, 4) NOT NULL,
+            currency varchar(3) NOT NULL DEFAULT 'USD',
+            "timestamp" timestamptz NOT NULL DEFAULT now(),
+            last_seen_at timestamptz,
+            observations integer NOT NULL DEFAULT 1,
+            CONSTRAINT pk_price_records PRIMARY KEY (id, "timestamp"),
+            CONSTRAINT fk_price_records_product_id_products
+                FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE
+        ) PARTITION BY RANGE ("timestamp")
+        """
+    )
+    op.execute("ALTER SEQUENCE price_records_id_seq OWNED BY price_records.id")
+    op.execute("CREATE TABLE price_records_default PARTITION OF price_records DEFAULT")
+
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+    op.execute(
+        """
+        SELECT flux_ensure_price_partitions(
+            COALESCE((SELECT min("timestamp") FROM price_records_unpartitioned), now())::date,
+            (now() + interval '3 months')::date
+        )
+        """
+    )
+
+    op.execute(
+        """
+        INSERT INTO price_records (id, product_id, price, currency, "timestamp", last_seen_at, observations)
+        SELECT id, product_id, price, currency, "timestamp", last_seen_at, observations
+        FROM price_records_unpartitioned
+        """
+    )
+    op.execute("DROP TABLE price_records_unpartitioned")
+
+    op.execute('CREATE INDEX ix_price_records_product_id_timestamp ON price_records (product_id, "timestamp")')
+    op.execute('CREATE INDEX ix_price_records_timestamp_brin ON price_records USING brin ("timestamp")')
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE price_records RENAME TO price_records_partitioned")
+    op.execute(
+        "ALTER TABLE price_records_partitioned RENAME CONSTRAINT pk_price_records TO pk_price_records_partitioned"
+    )
+    op.execute(
+        "ALTER TABLE price_records_partitioned "
+        "RENAME CONSTRAINT fk_price_records_product_id_products TO fk_price_records_partitioned_product_id_products"
+    )
+    op.execute("ALTER SEQUENCE price_records_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE price_records (
+            id integer NOT NULL DEFAULT nextval('price_records_id_seq'::regclass),
+            product_id integer NOT NULL,
+            price numeric(12, 4) NOT NULL,
+            currency varchar(3) NOT NULL DEFAULT 'USD',
+            "timestamp" timestamptz NOT NULL DEFAULT now(),
+            last_seen_at timestamptz,
+            observations integer NOT NULL DEFAULT 1,
+            CONSTRAINT pk_price_records PRIMARY KEY (id),
+            CONSTRAINT fk_price_records_product_id_products
+                FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE price_records_id_seq OWNED BY price_records.id")
+    op.execute(
+        """
+        INSERT INTO price_records (id, product_id, price, currency, "timestamp", last_seen_at, observations)
+        SELECT id, product_id, price, currency, "timestamp", last_seen_at, observations
+        FROM price_records_partitioned
+        """
+    )
+    op.execute("DROP TABLE price_records_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS flux_ensure_price_partitions(date, date)")
+    op.create_index("ix_price_records_product_id", "price_records", ["product_id"], unique=False)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+ROLLUP_TABLES = {
+    "price_rollups_hour": "hour",
+    "price_rollups_day": "day",
+}
+
+
+def upgrade() -> None:
+    for table_name, unit in ROLLUP_TABLES.items():
+        op.create_table(
+            table_name,
+            sa.Column("product_id", sa.Integer(), nullable=False),
+            sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("currency", sa.String(length=3), nullable=False),
+            sa.Column("open", sa.Numeric(12, 4), nullable=False),
+            sa.Column("high", sa.Numeric(12, 4), nullable=False),
+            sa.Column("low", sa.Numeric(12, 4), nullable=False),
+            sa.Column("close", sa.Numeric(12, 4), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False),
+            sa.Column("open_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("close_at", sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("product_id", "bucket", "currency", name=f"pk_{table_name}"),
+            sa.ForeignKeyConstraint(
+                ["product_id"],
+                ["products.id"],
+                name=f"fk_{table_name}_product_id_products",
+                ondelete="CASCADE",
+            ),
+        )
+
+        op.execute(
+            f"""
+            INSERT INTO {table_name} (product_id, bucket, currency, open, high, low, close, count, open_at, close_at)
+            SELECT
+                product_id,
+                date_trunc('{unit}', "timestamp" AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                currency,
+                (array_agg(price ORDER BY "timestamp", id))[1],
+                max(price),
+                min(price),
+                (array_agg(price ORDER BY "timestamp" DESC, id DESC))[1],
+                sum(observations),
+                min("timestamp"),
+                max("timestamp")
+            FROM price_records
+            GROUP BY 1, 2, 3
+            """
+        )
+
+
+def downgrade() -> None:
+    for table_name in reversed(list(ROLLUP_TABLES)):
+        op.drop_table(table_name)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "products",
+        sa.Column("next_due_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.add_column("products", sa.Column("scrape_interval_s", sa.Integer(), nullable=True))
+
+    # Spread existing products over the first hour instead of making them all due at once.
+    op.execute("UPDATE products SET next_due_at = now() + random() * interval '1 hour'")
+
+    op.create_index("ix_products_next_due_at", "products", ["next_due_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_next_due_at", table_name="products")
+    op.drop_column("products", "scrape_interval_s")
+    op.drop_column("products", "next_due_at")
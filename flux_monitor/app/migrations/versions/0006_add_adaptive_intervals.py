@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("interval_override_s", sa.Integer(), nullable=True))
+    op.add_column("products", sa.Column("interval_reason", sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("products", "interval_reason")
+    op.drop_column("products", "interval_override_s")
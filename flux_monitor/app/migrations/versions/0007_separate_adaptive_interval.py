@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("adaptive_interval_s", sa.Integer(), nullable=True))
+    op.add_column("products", sa.Column("interval_decided_at", sa.DateTime(timezone=True), nullable=True))
+    # Until now adapt_intervals wrote into scrape_interval_s and always set interval_reason alongside it.
+    op.execute(
+        "UPDATE products SET adaptive_interval_s = scrape_interval_s, scrape_interval_s = NULL, "
+        "interval_decided_at = now() WHERE interval_reason IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE products SET scrape_interval_s = adaptive_interval_s "
+        "WHERE scrape_interval_s IS NULL AND adaptive_interval_s IS NOT NULL"
+    )
+    op.drop_column("products", "interval_decided_at")
+    op.drop_column("products", "adaptive_interval_s")
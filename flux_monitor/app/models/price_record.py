@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -11,16 +11,27 @@ from app.models.base import Base
 
 class PriceRecord(Base):
     __tablename__ = "price_records"
+    __table_args__ = (
+        Index("ix_price_records_product_id_timestamp", "product_id", "timestamp"),
+        Index("ix_price_records_timestamp_brin", "timestamp", postgresql_using="brin"),
+        {"postgresql_partition_by": 'RANGE ("timestamp")'},
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     product_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("products.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     price: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
     currency: Mapped[str] = mapped_column(String(3), nullable=False, server_default="USD")
-    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        server_default=func.now(),
+        nullable=False,
+    )
+    last_seen_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    observations: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
 
     product = relationship("Product", back_populates="price_records")
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class _PriceRollupColumns:
+    product_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    open: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
+    high: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
+    low: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
+    close: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    open_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    close_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class PriceRollupHour(_PriceRollupColumns, Base):
+    __tablename__ = "price_rollups_hour"
+
+
+class PriceRollupDay(_PriceRollupColumns, Base):
+    __tablename__ = "price_rollups_day"
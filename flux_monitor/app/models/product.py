@@ -16,6 +16,17 @@ class Product(Base):
     url: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
     price_selector: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    next_due_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+    )
+    scrape_interval_s: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    interval_override_s: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    adaptive_interval_s: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    interval_reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    interval_decided_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     price_records = relationship(
         "PriceRecord",
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext, Request, Route
+from playwright.async_api import Error as PlaywrightError
+
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+KNOWN_TRACKER_HOSTS: frozenset[str] = frozenset(
+    {
+        "adnxs.com",
+        "adservice.google.com",
+        "amazon-adsystem.com",
+        "bat.bing.com",
+        "clarity.ms",
+        "connect.facebook.net",
+        "criteo.com",
+        "criteo.net",
+        "doubleclick.net",
+        "google-analytics.com",
+        "googleadservices.com",
+        "googlesyndication.com",
+        "googletagmanager.com",
+        "googletagservices.com",
+        "hotjar.com",
+        "mixpanel.com",
+        "nr-data.net",
+        "optimizely.com",
+        "outbrain.com",
+        "quantserve.com",
+        "scorecardresearch.com",
+        "segment.com",
+        "segment.io",
+        "taboola.com",
+    }
+)
+
+
+@dataclass
+class BlockingStats:
+    allowed_requests: int = 0
+    blocked_requests: int = 0
+    blocked_trackers: int = 0
+    received_bytes: int = 0
+    blocked_by_type: Counter[str] = field(default_factory=Counter)
+    _pending: set[asyncio.Task[None]] = field(default_factory=set, repr=False)
+
+    async def settle(self) -> None:
+        # Size lookups go through the browser, so they must finish before the context closes.
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def as_log(self) -> str:
+        by_type = ",".join(f"{kind}:{count}" for kind, count in sorted(self.blocked_by_type.items())) or "-"
+        return (
+            f"allowed={self.allowed_requests} blocked={self.blocked_requests} "
+            f"trackers={self.blocked_trackers} blocked_types={by_type} received_bytes={self.received_bytes}"
+        )
+
+
+def _host_matches(host: str, hosts: frozenset[str]) -> bool:
+    labels = host.split(".")
+    return any(".".join(labels[i:]) in hosts for i in range(len(labels)))
+
+
+def _rule_for(domain: str, rules: dict[str, list[str]]) -> frozenset[str]:
+    labels = domain.split(".")
+    for i in range(len(labels)):
+        candidate = ".".join(labels[i:])
+        if candidate in rules:
+            return frozenset(rules[candidate])
+    return frozenset()
+
+
+class ResourceBlocker:
+    def __init__(
+        self,
+        blocked_types: list[str],
+        tracker_hosts: frozenset[str],
+        domain_allow_types: dict[str, list[str]],
+        domain_deny_types: dict[str, list[str]],
+    ) -> None:
+        self._blocked_types = frozenset(blocked_types)
+        self._tracker_hosts = tracker_hosts
+        self._domain_allow_types = domain_allow_types
+        self._domain_deny_types = domain_deny_types
+
+    def blocked_types_for(self, page_domain: str) -> frozenset[str]:
+        allowed = _rule_for(page_domain, self._domain_allow_types)
+        denied = _rule_for(page_domain, self._domain_deny_types)
+        return (self._blocked_types - allowed) | denied
+
+    async def attach(self, context: BrowserContext, page_domain: str) -> BlockingStats:
+        stats = BlockingStats()
+        blocked_types = self.blocked_types_for(page_domain)
+
+        async def _handle(route: Route) -> None:
+            request = route.request
+            host = (urlparse(request.url).hostname or "").lower()
+
+            if host and host != page_domain and _host_matches(host, self._tracker_hosts):
+                stats.blocked_requests += 1
+                stats.blocked_trackers += 1
+                await route.abort("blockedbyclient")
+                return
+
+            if request.resource_type in blocked_types:
+                stats.blocked_requests += 1
+                stats.blocked_by_type[request.resource_type] += 1
+                await route.abort("blockedbyclient")
+                return
+
+            stats.allowed_requests += 1
+            await route.continue_()
+
+        async def _count(request: Request) -> None:
+            # content-length is missing on chunked and compressed responses; the browser's own
+            # accounting covers them, as bytes on the wire.
+            try:
+                sizes = await request.sizes()
+            except PlaywrightError:
+                return
+            stats.received_bytes += sizes["responseHeadersSize"] + sizes["responseBodySize"]
+
+        def _on_finished(request: Request) -> None:
+            task = asyncio.ensure_future(_count(request))
+            stats._pending.add(task)
+            task.add_done_callback(stats._pending.discard)
+
+        await context.route("**/*", _handle)
+        context.on("requestfinished", _on_finished)
+        return stats
+
+
+_blocker: ResourceBlocker | None = None
+
+
+def get_resource_blocker() -> ResourceBlocker:
+    global _blocker
+    if _blocker is None:
+        _blocker = ResourceBlocker(
+            blocked_types=settings.resource_block_types,
+            tracker_hosts=KNOWN_TRACKER_HOSTS | frozenset(settings.resource_block_hosts),
+            domain_allow_types=settings.resource_allow_types_by_domain,
+            domain_deny_types=settings.resource_block_types_by_domain,
+        )
+    return _blocker
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from app.core.settings import settings
+from app.scraping.trace import phase
+
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE_BYTES = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    launches: int = 0
+    recycles: int = 0
+    health_failures: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        checkouts = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / checkouts, 4) if checkouts else None,
+            "launches": self.launches,
+            "recycles": self.recycles,
+            "health_failures": self.health_failures,
+        }
+
+
+@dataclass(eq=False)
+class _PooledBrowser:
+    browser: Browser
+    pages_served: int = 0
+    active_contexts: int = 0
+    retiring: bool = False
+    memory_mb: float | None = field(default=None)
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        size: int,
+        max_pages_per_browser: int,
+        max_memory_mb: int,
+        stats_log_every: int = 0,
+        headless: bool = True,
+    ) -> None:
+        self._size = max(1, size)
+        self._max_pages = max_pages_per_browser
+        self._max_memory_mb = max_memory_mb
+        self._stats_log_every = stats_log_every
+        self._headless = headless
+        self._playwright: Playwright | None = None
+        self._browsers: list[_PooledBrowser] = []
+        self._lock = asyncio.Lock()
+        self.stats = PoolStats()
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> None:
+        async with self._lock:
+            await self._ensure_playwright()
+            while len(self._browsers) < self._size:
+                self._browsers.append(await self._launch())
+
+        logger.info("browser_pool_started size=%s", self._size)
+
+    async def close(self) -> None:
+        async with self._lock:
+            browsers, self._browsers = self._browsers, []
+            for pooled in browsers:
+                await self._close_browser(pooled)
+
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+        logger.info("browser_pool_closed %s", _format_stats(self.stats.as_dict()))
+
+    @asynccontextmanager
+    async def context(self, **context_options: Any) -> AsyncIterator[BrowserContext]:
+        with phase("browser_acquire"):
+            pooled = await self._checkout()
+        context: BrowserContext | None = None
+        try:
+            with phase("browser_acquire"):
+                context = await pooled.browser.new_context(**context_options)
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as exc:
+                    logger.warning("browser_pool_context_close_failed err=%s", str(exc))
+            await self._checkin(pooled)
+
+    async def _ensure_playwright(self) -> Playwright:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return self._playwright
+
+    async def _launch(self) -> _PooledBrowser:
+        playwright = await self._ensure_playwright()
+        browser = await playwright.chromium.launch(headless=self._headless)
+        self.stats.launches += 1
+        return _PooledBrowser(browser=browser)
+
+    async def _checkout(self) -> _PooledBrowser:
+        async with self._lock:
+            healthy: list[_PooledBrowser] = []
+            for pooled in list(self._browsers):
+                if pooled.browser.is_connected():
+                    healthy.append(pooled)
+                    continue
+
+                self.stats.health_failures += 1
+                logger.warning("browser_pool_unhealthy pages_served=%s", pooled.pages_served)
+                await self._retire(pooled)
+
+            idle = [pooled for pooled in healthy if pooled.active_contexts == 0]
+            if idle:
+                pooled = idle[0]
+                self.stats.hits += 1
+            elif len(healthy) < self._size:
+                pooled = await self._launch()
+                self._browsers.append(pooled)
+                self.stats.misses += 1
+            else:
+                pooled = min(healthy, key=lambda candidate: candidate.active_contexts)
+                self.stats.hits += 1
+
+            pooled.active_contexts += 1
+            pooled.pages_served += 1
+
+            checkouts = self.stats.hits + self.stats.misses
+            if self._stats_log_every > 0 and checkouts % self._stats_log_every == 0:
+                logger.info("browser_pool_stats %s", _format_stats(self.stats.as_dict()))
+
+            return pooled
+
+    async def _checkin(self, pooled: _PooledBrowser) -> None:
+        memory_mb = await self._memory_mb(pooled) if self._max_memory_mb > 0 else None
+
+        async with self._lock:
+            pooled.active_contexts -= 1
+            pooled.memory_mb = memory_mb
+
+            if not pooled.retiring:
+                reason = self._recycle_reason(pooled)
+                if reason:
+                    self.stats.recycles += 1
+                    logger.info(
+                        "browser_pool_recycle reason=%s pages_served=%s memory_mb=%s",
+                        reason,
+                        pooled.pages_served,
+                        memory_mb,
+                    )
+                    await self._retire(pooled)
+                    return
+
+            if pooled.retiring and pooled.active_contexts <= 0:
+                await self._close_browser(pooled)
+
+    def _recycle_reason(self, pooled: _PooledBrowser) -> str | None:
+        if not pooled.browser.is_connected():
+            return "disconnected"
+        if self._max_pages > 0 and pooled.pages_served >= self._max_pages:
+            return "max_pages"
+        if self._max_memory_mb > 0 and pooled.memory_mb is not None and pooled.memory_mb >= self._max_memory_mb:
+            return "max_memory"
+        return None
+
+    async def _retire(self, pooled: _PooledBrowser) -> None:
+        pooled.retiring = True
+        if pooled in self._browsers:
+            self._browsers.remove(pooled)
+        if pooled.active_contexts <= 0:
+            await self._close_browser(pooled)
+
+    async def _close_browser(self, pooled: _PooledBrowser) -> None:
+        try:
+            await pooled.browser.close()
+        except Exception as exc:
+            logger.warning("browser_pool_close_failed err=%s", str(exc))
+
+    async def _memory_mb(self, pooled: _PooledBrowser) -> float | None:
+        if not pooled.browser.is_connected():
+            return None
+
+        try:
+            session = await pooled.browser.new_browser_cdp_session()
+            try:
+                info = await session.send("SystemInfo.getProcessInfo")
+            finally:
+                await session.detach()
+        except Exception:
+            return None
+
+        readings = [_process_rss_bytes(int(process["id"])) for process in info.get("processInfo", [])]
+        readings = [rss for rss in readings if rss is not None]
+        if not readings:
+            return None
+
+        return sum(readings) / (1024 * 1024)
+
+
+def _process_rss_bytes(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as fh:
+            resident_pages = int(fh.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * _PAGE_SIZE_BYTES
+
+
+def _format_stats(stats: dict[str, Any]) -> str:
+    return " ".join(f"{key}={value}" for key, value in stats.items())
+
+
+_pool: BrowserPool | None = None
+
+
+def get_browser_pool() -> BrowserPool:
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool(
+            size=settings.browser_pool_size,
+            max_pages_per_browser=settings.browser_max_pages,
+            max_memory_mb=settings.browser_max_memory_mb,
+            stats_log_every=settings.browser_pool_stats_log_every,
+        )
+    return _pool
+
+
+def reset_browser_pool() -> None:
+    global _pool
+    _pool = None
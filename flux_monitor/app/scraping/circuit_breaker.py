@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.metrics import CIRCUIT_BREAKER_TRANSITIONS
+from app.core.redis import get_async_redis
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "flux:breaker:"
+_DOMAINS_KEY = "flux:breaker:domains"
+
+CLOSED = "closed"
+
+# Decides whether a request to the domain may go ahead. Returns {decision, wait_ms, state}
+# where decision is 1 (allowed), 2 (allowed as the single half-open probe) or 0 (rejected,
+# retry in wait_ms). An open breaker turns half-open once its cool-down has passed; a probe
+# that never reports back loses its lease after ARGV[1] ms so another worker can probe.
+_ACQUIRE_LUA = """
+local probe_ms = tonumber(ARGV[1])
+
+local clock = redis.call('TIME')
+local now_ms = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'state', 'open_until', 'probe_until')
+local current = state[1] or 'closed'
+if current == 'closed' then
+    return {1, 0, current}
+end
+
+if current == 'open' then
+    local open_until = tonumber(state[2]) or 0
+    if now_ms < open_until then
+        return {0, open_until - now_ms, current}
+    end
+    redis.call('HSET', KEYS[1], 'state', 'half_open', 'probe_until', now_ms + probe_ms)
+    return {2, 0, 'half_open'}
+end
+
+local probe_until = tonumber(state[3]) or 0
+if now_ms < probe_until then
+    return {0, probe_until - now_ms, current}
+end
+redis.call('HSET', KEYS[1], 'probe_until', now_ms + probe_ms)
+return {2, 0, current}
+"""
+
+# Records the result of a request. ARGV: success (1/0), probe (1/0), window_ms, min_requests,
+# failure_rate, open_ms, max_open_ms, ttl_ms. Returns {state, changed}.
+_RECORD_LUA = """
+local success = ARGV[1] == '1'
+local probe = ARGV[2] == '1'
+local window_ms = tonumber(ARGV[3])
+local min_requests = tonumber(ARGV[4])
+local failure_rate = tonumber(ARGV[5])
+local open_ms = tonumber(ARGV[6])
+local max_open_ms = tonumber(ARGV[7])
+local ttl_ms = tonumber(ARGV[8])
+
+local clock = redis.call('TIME')
+local now_ms = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'state', 'window_start', 'requests', 'failures', 'trips')
+local current = state[1] or 'closed'
+local trips = tonumber(state[5]) or 0
+
+redis.call('SADD', KEYS[2], ARGV[9])
+
+local function trip()
+    trips = trips + 1
+    local cooldown = math.min(max_open_ms, open_ms * math.pow(2, trips - 1))
+    redis.call('HSET', KEYS[1], 'state', 'open', 'opened_at', now_ms, 'open_until', now_ms + cooldown, 'trips', trips)
+    redis.call('HDEL', KEYS[1], 'probe_until')
+    redis.call('PEXPIRE', KEYS[1], ttl_ms + cooldown)
+    return {'open', 1}
+end
+
+if current == 'half_open' then
+    if not probe then
+        return {current, 0}
+    end
+    if not success then
+        return trip()
+    end
+    redis.call('DEL', KEYS[1])
+    redis.call('HSET', KEYS[1], 'state', 'closed', 'window_start', now_ms, 'requests', 0, 'failures', 0)
+    redis.call('PEXPIRE', KEYS[1], ttl_ms)
+    return {'closed', 1}
+end
+
+if current == 'open' then
+    return {current, 0}
+end
+
+local window_start = tonumber(state[2]) or now_ms
+local requests = tonumber(state[3]) or 0
+local failures = tonumber(state[4]) or 0
+if now_ms - window_start > window_ms then
+    window_start = now_ms
+    requests = 0
+    failures = 0
+end
+
+requests = requests + 1
+if not success then
+    failures = failures + 1
+end
+redis.call('HSET', KEYS[1], 'window_start', window_start, 'requests', requests, 'failures', failures)
+if not success then
+    redis.call('HSET', KEYS[1], 'last_failure_at', now_ms)
+end
+
+if requests >= min_requests and failures / requests >= failure_rate then
+    return trip()
+end
+
+redis.call('PEXPIRE', KEYS[1], ttl_ms)
+return {'closed', 0}
+"""
+
+
+class CircuitOpen(Exception):
+    def __init__(self, domain: str, retry_after: float) -> None:
+        super().__init__(f"Circuit breaker for {domain} is open; retry in {retry_after:.1f}s")
+        self.domain = domain
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class BreakerPermit:
+    domain: str
+    probe: bool
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        window_s: float,
+        min_requests: int,
+        failure_rate: float,
+        open_s: float,
+        max_open_s: float,
+        probe_timeout_s: float,
+    ) -> None:
+        self._window_ms = int(window_s * 1000)
+        self._min_requests = max(1, min_requests)
+        self._failure_rate = failure_rate
+        self._open_ms = int(open_s * 1000)
+        self._max_open_ms = int(max(open_s, max_open_s) * 1000)
+        self._probe_ms = int(probe_timeout_s * 1000)
+        self._acquire_script = None
+        self._record_script = None
+
+    async def check(self, domain: str) -> None:
+        # Read-only fast path: rejects while the breaker is open or a probe holds its lease,
+        # without taking the lease itself.
+        pipe = get_async_redis().pipeline(transaction=False)
+        pipe.hmget(f"{_KEY_PREFIX}{domain}", "state", "open_until", "probe_until")
+        pipe.time()
+        (state, open_until, probe_until), (seconds, microseconds) = await pipe.execute()
+
+        now_ms = int(seconds) * 1000 + int(microseconds) // 1000
+        if state == "open":
+            until_ms = int(open_until or 0)
+        elif state == "half_open":
+            until_ms = int(probe_until or 0)
+        else:
+            return
+        if now_ms < until_ms:
+            raise CircuitOpen(domain, retry_after=max(1.0, (until_ms - now_ms) / 1000))
+
+    async def acquire(self, domain: str) -> BreakerPermit:
+        if self._acquire_script is None:
+            self._acquire_script = get_async_redis().register_script(_ACQUIRE_LUA)
+
+        decision, wait_ms, state = await self._acquire_script(keys=[f"{_KEY_PREFIX}{domain}"], args=[self._probe_ms])
+        if int(decision) == 0:
+            raise CircuitOpen(domain, retry_after=max(1.0, int(wait_ms) / 1000))
+
+        probe = int(decision) == 2
+        if probe:
+            logger.info("circuit_breaker_probe domain=%s state=%s", domain, state)
+        return BreakerPermit(domain=domain, probe=probe)
+
+    async def record(self, permit: BreakerPermit, success: bool) -> str:
+        if self._record_script is None:
+            self._record_script = get_async_redis().register_script(_RECORD_LUA)
+
+        state, changed = await self._record_script(
+            keys=[f"{_KEY_PREFIX}{permit.domain}", _DOMAINS_KEY],
+            args=[
+                int(success),
+                int(permit.probe),
+                self._window_ms,
+                self._min_requests,
+                self._failure_rate,
+                self._open_ms,
+                self._max_open_ms,
+                self._window_ms + self._max_open_ms,
+                permit.domain,
+            ],
+        )
+        if int(changed):
+            CIRCUIT_BREAKER_TRANSITIONS.labels(permit.domain, state).inc()
+            logger.warning("circuit_breaker_transition domain=%s state=%s probe=%s", permit.domain, state, permit.probe)
+        return state
+
+    async def release(self, permit: BreakerPermit) -> None:
+        # A probe that never reached the site (e.g. it was rate limited) should not hold the lease.
+        if permit.probe:
+            await get_async_redis().hdel(f"{_KEY_PREFIX}{permit.domain}", "probe_until")
+
+    async def state(self, domain: str) -> dict[str, Any]:
+        return _describe(domain, await get_async_redis().hgetall(f"{_KEY_PREFIX}{domain}"))
+
+    async def states(self) -> list[dict[str, Any]]:
+        redis = get_async_redis()
+        domains = sorted(await redis.smembers(_DOMAINS_KEY))
+        if not domains:
+            return []
+
+        pipe = redis.pipeline(transaction=False)
+        for domain in domains:
+            pipe.hgetall(f"{_KEY_PREFIX}{domain}")
+        raws = await pipe.execute()
+
+        expired = [domain for domain, raw in zip(domains, raws) if not raw]
+        if expired:
+            await redis.srem(_DOMAINS_KEY, *expired)
+        return [_describe(domain, raw) for domain, raw in zip(domains, raws) if raw]
+
+    async def reset(self, domain: str) -> bool:
+        redis = get_async_redis()
+        deleted = await redis.delete(f"{_KEY_PREFIX}{domain}")
+        await redis.srem(_DOMAINS_KEY, domain)
+        if deleted:
+            logger.info("circuit_breaker_reset domain=%s", domain)
+        return bool(deleted)
+
+
+def _from_ms(raw: str | None) -> datetime | None:
+    return datetime.fromtimestamp(int(raw) / 1000, tz=timezone.utc) if raw else None
+
+
+def _describe(domain: str, raw: dict[str, str]) -> dict[str, Any]:
+    requests = int(raw.get("requests") or 0)
+    failures = int(raw.get("failures") or 0)
+    return {
+        "domain": domain,
+        "state": raw.get("state") or CLOSED,
+        "requests": requests,
+        "failures": failures,
+        "failure_rate": round(failures / requests, 4) if requests else None,
+        "trips": int(raw.get("trips") or 0),
+        "opened_at": _from_ms(raw.get("opened_at")),
+        "open_until": _from_ms(raw.get("open_until")),
+        "last_failure_at": _from_ms(raw.get("last_failure_at")),
+    }
+
+
+_breaker: CircuitBreaker | None = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            window_s=settings.circuit_breaker_window_s,
+            min_requests=settings.circuit_breaker_min_requests,
+            failure_rate=settings.circuit_breaker_failure_rate,
+            open_s=settings.circuit_breaker_open_s,
+            max_open_s=settings.circuit_breaker_max_open_s,
+            probe_timeout_s=settings.circuit_breaker_probe_timeout_s,
+        )
+    return _breaker
+
+
+def reset_circuit_breaker() -> None:
+    global _breaker
+    _breaker = None
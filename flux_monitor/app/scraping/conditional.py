@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.core.redis import get_async_redis
+from app.core.settings import settings
+from app.scraping.selectors import PriceExtraction
+
+
+_STATE_KEY = "flux:conditional:product:{}"
+_STATS_KEY = "flux:conditional:stats:{}"
+_DOMAINS_KEY = "flux:conditional:domains"
+
+
+def body_fingerprint(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def region_fingerprint(extraction: PriceExtraction) -> str:
+    region = "\0".join((extraction.selector, extraction.text.strip(), extraction.currency or ""))
+    return hashlib.blake2b(region.encode(), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class ConditionalState:
+    etag: str | None = None
+    last_modified: str | None = None
+    body_hash: str | None = None
+    region_hash: str | None = None
+    size: int = 0
+    price: str | None = None
+    currency: str | None = None
+
+    @property
+    def reusable(self) -> bool:
+        return self.price is not None and self.currency is not None
+
+    def request_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    @classmethod
+    def from_hash(cls, raw: dict[str, str]) -> ConditionalState:
+        return cls(
+            etag=raw.get("etag"),
+            last_modified=raw.get("last_modified"),
+            body_hash=raw.get("body_hash"),
+            region_hash=raw.get("region_hash"),
+            size=int(raw.get("size") or 0),
+            price=raw.get("price"),
+            currency=raw.get("currency"),
+        )
+
+
+class ConditionalStore:
+    def __init__(self, ttl_s: int) -> None:
+        self._ttl_s = ttl_s
+
+    async def load(self, product_id: int) -> ConditionalState:
+        return ConditionalState.from_hash(await get_async_redis().hgetall(_STATE_KEY.format(product_id)))
+
+    async def save(self, product_id: int, state: ConditionalState) -> None:
+        key = _STATE_KEY.format(product_id)
+        mapping = {field: value for field, value in asdict(state).items() if value is not None}
+
+        pipe = get_async_redis().pipeline(transaction=True)
+        pipe.delete(key)
+        if mapping:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self._ttl_s)
+        await pipe.execute()
+
+    async def record(self, domain: str, **counters: float) -> None:
+        key = _STATS_KEY.format(domain)
+        pipe = get_async_redis().pipeline(transaction=False)
+        pipe.sadd(_DOMAINS_KEY, domain)
+        for field, amount in counters.items():
+            if isinstance(amount, int):
+                pipe.hincrby(key, field, amount)
+            else:
+                pipe.hincrbyfloat(key, field, amount)
+        await pipe.execute()
+
+    async def stats(self) -> dict[str, dict[str, Any]]:
+        redis = get_async_redis()
+        domains = sorted(await redis.smembers(_DOMAINS_KEY))
+
+        pipe = redis.pipeline(transaction=False)
+        for domain in domains:
+            pipe.hgetall(_STATS_KEY.format(domain))
+        raw_stats = await pipe.execute()
+
+        result: dict[str, dict[str, Any]] = {}
+        for domain, raw in zip(domains, raw_stats):
+            values: dict[str, Any] = {key: float(value) if "_ms" in key else int(value) for key, value in raw.items()}
+
+            parses = values.get("parses", 0)
+            renders = values.get("browser_renders", 0)
+            avg_parse_ms = values.get("parse_ms_total", 0.0) / parses if parses else 0.0
+            avg_render_ms = values.get("render_ms_total", 0.0) / renders if renders else 0.0
+            skipped_parses = values.get("http_not_modified", 0) + values.get("http_fingerprint_matches", 0)
+            fetches = values.get("http_fetches", 0)
+
+            values["skip_rate"] = round(skipped_parses / fetches, 4) if fetches else None
+            values["parse_ms_saved"] = round(skipped_parses * avg_parse_ms, 3)
+            values["render_ms_saved"] = round(values.get("renders_skipped", 0) * avg_render_ms, 3)
+            result[domain] = values
+
+        return result
+
+
+_store: ConditionalStore | None = None
+
+
+def get_conditional_store() -> ConditionalStore:
+    global _store
+    if _store is None:
+        _store = ConditionalStore(ttl_s=settings.conditional_state_ttl_s)
+    return _store
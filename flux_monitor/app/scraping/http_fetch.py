@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+
+import httpx
+from bs4 import BeautifulSoup, Tag
+
+from app.core.settings import settings
+from app.scraping.conditional import ConditionalState, body_fingerprint
+from app.scraping.selectors import (
+    BODY_SELECTOR,
+    JSONLD_SELECTOR,
+    PriceExtraction,
+    ordered_selectors,
+    price_from_jsonld,
+)
+from app.scraping.trace import phase
+
+
+logger = logging.getLogger(__name__)
+
+
+class StaticFetchError(Exception):
+    pass
+
+
+class StaticPriceNotFound(StaticFetchError):
+    pass
+
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(settings.static_fetch_timeout_s),
+            limits=httpx.Limits(
+                max_connections=settings.static_fetch_max_connections,
+                max_keepalive_connections=settings.static_fetch_max_connections,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+
+
+def reset_http_client() -> None:
+    global _client
+    _client = None
+
+
+def _jsonld_price(soup: BeautifulSoup) -> tuple[str, str | None] | None:
+    for script in soup.find_all("script", attrs={"type": "application/ld+json"}):
+        try:
+            found = price_from_jsonld(json.loads(script.string or ""))
+        except ValueError:
+            continue
+        if found:
+            return found
+    return None
+
+
+def _microdata_currency(element: Tag) -> str | None:
+    scope = element.find_parent(attrs={"itemscope": True}) or element.find_parent("html")
+    currency = scope.select_one('[itemprop="priceCurrency"]') if scope is not None else None
+    if currency is None:
+        return None
+    return str(currency.get("content") or currency.get_text(strip=True)) or None
+
+
+def _element_price(element: Tag) -> tuple[str, str | None] | None:
+    if element.name == "meta":
+        value = str(element.get("content") or "").strip()
+        return (value, None) if value else None
+
+    if element.has_attr("itemprop") and str(element.get("content") or "").strip():
+        return str(element["content"]).strip(), _microdata_currency(element)
+
+    text = element.get_text(" ", strip=True)
+    if not text:
+        return None
+    return text, _microdata_currency(element) if element.has_attr("itemprop") else None
+
+
+def extract_price_text_from_html(
+    html: str,
+    selector_override: str | None,
+    preferred_selector: str | None = None,
+) -> PriceExtraction:
+    soup = BeautifulSoup(html, "lxml")
+
+    misses = 0
+    miss_seconds = 0.0
+    for selector in ordered_selectors(selector_override, preferred_selector):
+        if selector == BODY_SELECTOR:
+            continue
+
+        started = time.perf_counter()
+        if selector == JSONLD_SELECTOR:
+            found = _jsonld_price(soup)
+        else:
+            try:
+                element = soup.select_one(selector)
+            except Exception:
+                element = None
+            found = _element_price(element) if element is not None else None
+
+        if found:
+            text, currency = found
+            return PriceExtraction(text, selector, misses, miss_seconds, currency)
+
+        misses += 1
+        miss_seconds += time.perf_counter() - started
+
+    raise StaticPriceNotFound("Unable to locate price in static HTML")
+
+
+@dataclass(frozen=True)
+class StaticFetchResult:
+    extraction: PriceExtraction | None
+    unchanged: bool
+    not_modified: bool
+    etag: str | None
+    last_modified: str | None
+    body_hash: str | None
+    size: int
+    parse_ms: float = 0.0
+
+
+def _not_modified(previous: ConditionalState) -> StaticFetchResult:
+    return StaticFetchResult(
+        extraction=None,
+        unchanged=True,
+        not_modified=True,
+        etag=previous.etag,
+        last_modified=previous.last_modified,
+        body_hash=previous.body_hash,
+        size=previous.size,
+    )
+
+
+async def _conditional_get(url: str, user_agent: str, previous: ConditionalState | None) -> httpx.Response:
+    headers = {"User-Agent": user_agent}
+    if previous is not None:
+        headers.update(previous.request_headers())
+
+    try:
+        with phase("http"):
+            return await get_http_client().get(url, headers=headers)
+    except httpx.HTTPError as exc:
+        raise StaticFetchError(f"Static fetch failed for {url}: {exc}") from exc
+
+
+async def check_page_unchanged(url: str, user_agent: str, previous: ConditionalState) -> StaticFetchResult:
+    response = await _conditional_get(url, user_agent, previous)
+
+    if response.status_code == 304:
+        return _not_modified(previous)
+    if response.status_code != 200:
+        raise StaticFetchError(f"Static fetch for {url} returned HTTP {response.status_code}")
+
+    body_hash = body_fingerprint(response.content)
+    return StaticFetchResult(
+        extraction=None,
+        unchanged=body_hash == previous.body_hash,
+        not_modified=False,
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+        body_hash=body_hash,
+        size=len(response.content),
+    )
+
+
+async def fetch_static_price_text(
+    url: str,
+    selector_override: str | None,
+    user_agent: str,
+    preferred_selector: str | None = None,
+    previous: ConditionalState | None = None,
+) -> StaticFetchResult:
+    response = await _conditional_get(url, user_agent, previous)
+
+    if response.status_code == 304 and previous is not None:
+        return _not_modified(previous)
+    if response.status_code != 200:
+        raise StaticFetchError(f"Static fetch for {url} returned HTTP {response.status_code}")
+
+    content_type = response.headers.get("content-type", "")
+    if "html" not in content_type:
+        raise StaticFetchError(f"Static fetch for {url} returned non-HTML content '{content_type}'")
+
+    body_hash = body_fingerprint(response.content)
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if previous is not None and body_hash == previous.body_hash:
+        return StaticFetchResult(
+            extraction=None,
+            unchanged=True,
+            not_modified=False,
+            etag=etag,
+            last_modified=last_modified,
+            body_hash=body_hash,
+            size=len(response.content),
+        )
+
+    started = time.perf_counter()
+    with phase("parse"):
+        html = response.text[: settings.static_fetch_max_chars]
+        extraction = await asyncio.to_thread(extract_price_text_from_html, html, selector_override, preferred_selector)
+    return StaticFetchResult(
+        extraction=extraction,
+        unchanged=False,
+        not_modified=False,
+        etag=etag,
+        last_modified=last_modified,
+        body_hash=body_hash,
+        size=len(response.content),
+        parse_ms=(time.perf_counter() - started) * 1000,
+    )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from playwright.async_api import Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.scraping.selectors import BODY_PRICE_PATTERNS, BODY_SELECTOR, JSONLD_SELECTOR, PriceExtraction
+
+
+# Runs the whole selector cascade inside the page and returns the first hit
+# as {text, currency, index}, or null. Mirrors the static-HTML extractor in
+# app.scraping.http_fetch so both tiers agree on which source wins.
+_EXTRACT_PRICE_JS = """
+({ selectors, patterns, jsonldName, bodyName }) => {
+  const clean = (value) => (value === null || value === undefined ? "" : String(value).trim());
+
+  const fromJsonLd = (node) => {
+    if (!node || typeof node !== "object") return null;
+    if (Array.isArray(node)) {
+      for (const item of node) {
+        const found = fromJsonLd(item);
+        if (found) return found;
+      }
+      return null;
+    }
+    for (const offer of [].concat(node.offers || [])) {
+      if (!offer || typeof offer !== "object") continue;
+      const spec = offer.priceSpecification && typeof offer.priceSpecification === "object" ? offer.priceSpecification : {};
+      const price = [offer.price, offer.lowPrice, spec.price].map(clean).find(Boolean);
+      if (price) return { text: price, currency: clean(offer.priceCurrency || spec.priceCurrency) || null };
+    }
+    return node["@graph"] ? fromJsonLd(node["@graph"]) : null;
+  };
+
+  const microdataCurrency = (el) => {
+    const scope = el.closest("[itemscope]") || document;
+    const currency = scope.querySelector('[itemprop="priceCurrency"]');
+    return currency ? clean(currency.getAttribute("content") || currency.textContent) || null : null;
+  };
+
+  for (let index = 0; index < selectors.length; index++) {
+    const selector = selectors[index];
+
+    if (selector === jsonldName) {
+      for (const script of document.querySelectorAll('script[type="application/ld+json"]')) {
+        try {
+          const found = fromJsonLd(JSON.parse(script.textContent));
+          if (found) return { ...found, index };
+        } catch (e) {}
+      }
+      continue;
+    }
+
+    if (selector === bodyName) {
+      const text = document.body ? document.body.innerText : "";
+      for (const pattern of patterns) {
+        const m = text.match(new RegExp(pattern));
+        if (m) return { text: m[0], currency: null, index };
+      }
+      continue;
+    }
+
+    let el = null;
+    try {
+      el = document.querySelector(selector);
+    } catch (e) {
+      continue;
+    }
+    if (!el) continue;
+
+    if (el.tagName === "META") {
+      const content = clean(el.getAttribute("content"));
+      if (content) return { text: content, currency: null, index };
+      continue;
+    }
+
+    if (el.hasAttribute("itemprop") && clean(el.getAttribute("content"))) {
+      return { text: clean(el.getAttribute("content")), currency: microdataCurrency(el), index };
+    }
+
+    const text = clean(el.innerText || el.textContent);
+    if (text) return { text, currency: el.hasAttribute("itemprop") ? microdataCurrency(el) : null, index };
+  }
+
+  return null;
+}
+"""
+
+
+def _to_extraction(result: dict | None, selectors: list[str], skipped: int = 0) -> PriceExtraction | None:
+    if not result:
+        return None
+    index = int(result["index"])
+    return PriceExtraction(
+        text=result["text"],
+        selector=selectors[index],
+        misses=skipped + index,
+        currency=result.get("currency"),
+    )
+
+
+async def extract_price_in_page(page: Page, selectors: list[str], wait_ms: int) -> PriceExtraction | None:
+    def _arg(candidates: list[str]) -> dict:
+        return {
+            "selectors": candidates,
+            "patterns": list(BODY_PRICE_PATTERNS),
+            "jsonldName": JSONLD_SELECTOR,
+            "bodyName": BODY_SELECTOR,
+        }
+
+    if not selectors or selectors[0] == BODY_SELECTOR:
+        return _to_extraction(await page.evaluate(_EXTRACT_PRICE_JS, _arg(selectors)), selectors)
+
+    structured = [selector for selector in selectors if selector != BODY_SELECTOR]
+    try:
+        handle = await page.wait_for_function(
+            _EXTRACT_PRICE_JS,
+            arg=_arg(structured),
+            timeout=wait_ms,
+            polling=250,
+        )
+    except PlaywrightTimeoutError:
+        if BODY_SELECTOR not in selectors:
+            return None
+        result = await page.evaluate(_EXTRACT_PRICE_JS, _arg([BODY_SELECTOR]))
+        return _to_extraction(result, [BODY_SELECTOR], skipped=len(structured))
+
+    try:
+        return _to_extraction(await handle.json_value(), structured)
+    finally:
+        await handle.dispose()
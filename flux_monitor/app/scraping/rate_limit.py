@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from urllib.parse import urlparse
+
+from app.core.redis import get_async_redis
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "flux:ratelimit:"
+
+# Reserves one token from the domain bucket if the caller would have to wait
+# at most ARGV[3] ms for it. Returns the wait in ms (>= 0) when a token was
+# reserved, or the negated wait when it was not.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait_ms = tonumber(ARGV[3])
+
+local clock = redis.call('TIME')
+local now_ms = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = burst
+    ts = now_ms
+end
+
+tokens = math.min(burst, tokens + math.max(0, now_ms - ts) * rate / 1000) - 1
+
+local wait_ms = 0
+if tokens < 0 then
+    wait_ms = math.ceil(-tokens * 1000 / rate)
+    if wait_ms > max_wait_ms then
+        return -wait_ms
+    end
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now_ms)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst + 1) * 1000 / rate) + wait_ms)
+return wait_ms
+"""
+
+
+class RateLimited(Exception):
+    def __init__(self, domain: str, retry_after: float) -> None:
+        super().__init__(f"Rate limit for {domain} exceeded; retry in {retry_after:.1f}s")
+        self.domain = domain
+        self.retry_after = retry_after
+
+
+def domain_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def rate_for(domain: str) -> float:
+    overrides = settings.rate_limit_overrides
+    labels = domain.split(".")
+    for i in range(len(labels)):
+        candidate = ".".join(labels[i:])
+        if candidate in overrides:
+            return overrides[candidate]
+    return settings.rate_limit_default_rps
+
+
+class DomainRateLimiter:
+    def __init__(self, burst: int, max_wait_s: float) -> None:
+        self._burst = max(1, burst)
+        self._max_wait_s = max_wait_s
+        self._script = None
+
+    async def acquire(self, url: str) -> float:
+        domain = domain_of(url)
+        rate = rate_for(domain)
+        if not settings.rate_limit_enabled or not domain or rate <= 0:
+            return 0.0
+
+        if self._script is None:
+            self._script = get_async_redis().register_script(_TOKEN_BUCKET_LUA)
+
+        wait_ms = int(
+            await self._script(
+                keys=[f"{_KEY_PREFIX}{domain}"],
+                args=[rate, self._burst, int(self._max_wait_s * 1000)],
+            )
+        )
+        if wait_ms < 0:
+            raise RateLimited(domain, retry_after=-wait_ms / 1000)
+
+        if wait_ms:
+            logger.debug("rate_limit_wait domain=%s wait_ms=%s", domain, wait_ms)
+            await asyncio.sleep(wait_ms / 1000)
+        return wait_ms / 1000
+
+
+_limiter: DomainRateLimiter | None = None
+
+
+def get_rate_limiter() -> DomainRateLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = DomainRateLimiter(
+            burst=settings.rate_limit_burst,
+            max_wait_s=settings.rate_limit_max_wait_s,
+        )
+    return _limiter
+
+
+def reset_rate_limiter() -> None:
+    global _limiter
+    _limiter = None
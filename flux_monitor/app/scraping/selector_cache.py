@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.redis import get_async_redis
+from app.core.settings import settings
+from app.scraping.selectors import BODY_SELECTOR, PriceExtraction, ordered_selectors
+
+
+logger = logging.getLogger(__name__)
+
+_PRODUCT_KEY = "flux:selector:product:{}"
+_DOMAIN_KEY = "flux:selector:domain:{}"
+_STATS_KEY = "flux:selector:stats"
+
+
+@dataclass(frozen=True)
+class CachedSelector:
+    selector: str
+    scope: str
+
+
+class SelectorCache:
+    def __init__(self, ttl_s: int) -> None:
+        self._ttl_s = ttl_s
+
+    async def lookup(self, product_id: int, domain: str) -> CachedSelector | None:
+        product_selector, domain_selector = await get_async_redis().mget(
+            _PRODUCT_KEY.format(product_id),
+            _DOMAIN_KEY.format(domain),
+        )
+        # The body-text fallback is never worth trying first; ignore it if an older release cached it.
+        if product_selector and product_selector != BODY_SELECTOR:
+            return CachedSelector(product_selector, "product")
+        if domain_selector and domain_selector != BODY_SELECTOR:
+            return CachedSelector(domain_selector, "domain")
+        return None
+
+    async def observe(
+        self,
+        product_id: int,
+        domain: str,
+        cached: CachedSelector | None,
+        extraction: PriceExtraction,
+        selector_override: str | None,
+        tier: str,
+    ) -> None:
+        redis = get_async_redis()
+
+        if cached is not None and extraction.selector == cached.selector:
+            saved_s = await self._estimate_saved_seconds(tier, extraction.selector, selector_override)
+            pipe = redis.pipeline(transaction=False)
+            pipe.hincrby(_STATS_KEY, f"{tier}:hits", 1)
+            pipe.hincrbyfloat(_STATS_KEY, f"{tier}:seconds_saved", saved_s)
+            if cached.scope == "domain":
+                pipe.set(_PRODUCT_KEY.format(product_id), extraction.selector, ex=self._ttl_s)
+            await pipe.execute()
+            return
+
+        pipe = redis.pipeline(transaction=False)
+        if cached is not None:
+            logger.info(
+                "selector_cache_invalidated product_id=%s domain=%s scope=%s selector=%s winner=%s",
+                product_id,
+                domain,
+                cached.scope,
+                cached.selector,
+                extraction.selector,
+            )
+            pipe.hincrby(_STATS_KEY, f"{tier}:invalidations", 1)
+            pipe.delete(_PRODUCT_KEY.format(product_id))
+
+        pipe.hincrby(_STATS_KEY, f"{tier}:misses", 1)
+        pipe.hincrby(_STATS_KEY, f"{tier}:miss_attempts", extraction.misses)
+        pipe.hincrbyfloat(_STATS_KEY, f"{tier}:miss_seconds", extraction.miss_seconds)
+        if extraction.selector != BODY_SELECTOR:
+            pipe.set(_PRODUCT_KEY.format(product_id), extraction.selector, ex=self._ttl_s)
+            # A product's own price_selector says nothing about the rest of the shop.
+            if extraction.selector != selector_override:
+                pipe.set(_DOMAIN_KEY.format(domain), extraction.selector, ex=self._ttl_s)
+        await pipe.execute()
+
+    async def stats(self) -> dict[str, Any]:
+        raw = await get_async_redis().hgetall(_STATS_KEY)
+
+        tiers: dict[str, dict[str, Any]] = {}
+        for field, value in raw.items():
+            tier, _, name = field.partition(":")
+            tiers.setdefault(tier, {})[name] = float(value) if "seconds" in name else int(value)
+
+        for values in tiers.values():
+            hits = values.get("hits", 0)
+            lookups = hits + values.get("misses", 0)
+            attempts = values.get("miss_attempts", 0)
+            values["hit_rate"] = round(hits / lookups, 4) if lookups else None
+            values["avg_miss_seconds"] = round(values.get("miss_seconds", 0.0) / attempts, 4) if attempts else None
+
+        return tiers
+
+    async def _estimate_saved_seconds(self, tier: str, selector: str, selector_override: str | None) -> float:
+        cascade = ordered_selectors(selector_override)
+        skipped = cascade.index(selector) if selector in cascade else 0
+        if not skipped:
+            return 0.0
+
+        miss_seconds, miss_attempts = await get_async_redis().hmget(
+            _STATS_KEY,
+            f"{tier}:miss_seconds",
+            f"{tier}:miss_attempts",
+        )
+        if not miss_attempts or int(miss_attempts) == 0:
+            return 0.0
+        return skipped * float(miss_seconds or 0.0) / int(miss_attempts)
+
+
+_cache: SelectorCache | None = None
+
+
+def get_selector_cache() -> SelectorCache:
+    global _cache
+    if _cache is None:
+        _cache = SelectorCache(ttl_s=settings.selector_cache_ttl_s)
+    return _cache
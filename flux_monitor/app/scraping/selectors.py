@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+
+DEFAULT_PRICE_SELECTORS: tuple[str, ...] = (
+    '[itemprop="price"]',
+    'meta[property="product:price:amount"]',
+    'meta[name="product:price:amount"]',
+    '[data-test*="price" i]',
+    '[class*="price" i]',
+)
+
+JSONLD_SELECTOR = "jsonld"
+BODY_SELECTOR = "body"
+
+BODY_PRICE_PATTERNS: tuple[str, ...] = (
+    r"\$\s?[0-9][0-9\.,]*",
+    r"€\s?[0-9][0-9\.,]*",
+    r"£\s?[0-9][0-9\.,]*",
+)
+
+
+@dataclass(frozen=True)
+class PriceExtraction:
+    text: str
+    selector: str
+    misses: int = 0
+    miss_seconds: float = 0.0
+    currency: str | None = None
+
+
+def candidate_selectors(selector_override: str | None) -> list[str]:
+    selectors: list[str] = []
+    if selector_override:
+        selectors.append(selector_override)
+    selectors.append(JSONLD_SELECTOR)
+    selectors.extend(DEFAULT_PRICE_SELECTORS)
+    return selectors
+
+
+def ordered_selectors(selector_override: str | None, preferred: str | None = None) -> list[str]:
+    cascade = candidate_selectors(selector_override) + [BODY_SELECTOR]
+    if not preferred:
+        return cascade
+    return [preferred] + [selector for selector in cascade if selector != preferred]
+
+
+def price_from_jsonld(node: Any) -> tuple[str, str | None] | None:
+    if isinstance(node, list):
+        for item in node:
+            found = price_from_jsonld(item)
+            if found:
+                return found
+        return None
+
+    if not isinstance(node, dict):
+        return None
+
+    offers = node.get("offers")
+    for offer in offers if isinstance(offers, list) else [offers]:
+        if not isinstance(offer, dict):
+            continue
+
+        spec = offer.get("priceSpecification") if isinstance(offer.get("priceSpecification"), dict) else {}
+        # First price that is present and non-blank; a literal 0 counts, null or "" falls through.
+        candidates = (offer.get("price"), offer.get("lowPrice"), spec.get("price"))
+        price = next((str(value).strip() for value in candidates if value is not None and str(value).strip()), None)
+        if price:
+            currency = offer.get("priceCurrency") or spec.get("priceCurrency")
+            return price, str(currency).strip() if currency else None
+
+    if "@graph" in node:
+        return price_from_jsonld(node["@graph"])
+    return None
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from enum import Enum
+
+from app.core.redis import get_async_redis
+from app.core.settings import settings
+
+
+_KEY_PREFIX = "flux:strategy:"
+_PRODUCT_KEY = "flux:strategy:product:{}"
+_STATIC_OK_KEY = "flux:strategy:static_ok:{}"
+_STATIC_FAILED_KEY = "flux:strategy:static_failed:{}"
+
+
+class FetchStrategy(str, Enum):
+    HTTP = "http"
+    BROWSER = "browser"
+
+
+class BrowserRequired(Exception):
+    def __init__(self, domain: str) -> None:
+        super().__init__(f"{domain} needs a browser render")
+        self.domain = domain
+
+
+def _parse(value: str | None) -> FetchStrategy | None:
+    if value is None:
+        return None
+    try:
+        return FetchStrategy(value)
+    except ValueError:
+        return None
+
+
+async def get_fetch_strategy(domain: str, product_id: int | None = None) -> FetchStrategy | None:
+    if product_id is None:
+        return _parse(await get_async_redis().get(f"{_KEY_PREFIX}{domain}"))
+    product_value, domain_value = await get_async_redis().mget(
+        _PRODUCT_KEY.format(product_id),
+        f"{_KEY_PREFIX}{domain}",
+    )
+    return _parse(product_value) or _parse(domain_value)
+
+
+async def remember_static_result(domain: str, product_id: int, ok: bool) -> None:
+    # One product whose price only renders in a browser must not send the whole domain there;
+    # the domain flips only once enough distinct products fail static and they outnumber the ones it serves.
+    redis = get_async_redis()
+    ok_key, failed_key = _STATIC_OK_KEY.format(domain), _STATIC_FAILED_KEY.format(domain)
+    ttl_s = settings.fetch_strategy_ttl_s
+
+    pipe = redis.pipeline(transaction=True)
+    pipe.sadd(ok_key if ok else failed_key, product_id)
+    pipe.srem(failed_key if ok else ok_key, product_id)
+    pipe.expire(ok_key, ttl_s)
+    pipe.expire(failed_key, ttl_s)
+    pipe.scard(ok_key)
+    pipe.scard(failed_key)
+    if ok:
+        pipe.delete(_PRODUCT_KEY.format(product_id))
+        pipe.set(f"{_KEY_PREFIX}{domain}", FetchStrategy.HTTP.value, ex=ttl_s, nx=True)
+    else:
+        pipe.set(_PRODUCT_KEY.format(product_id), FetchStrategy.BROWSER.value, ex=ttl_s)
+    succeeded, failed = (await pipe.execute())[4:6]
+
+    if not ok and failed >= settings.fetch_strategy_browser_min_products and failed > succeeded:
+        await redis.set(f"{_KEY_PREFIX}{domain}", FetchStrategy.BROWSER.value, ex=ttl_s)
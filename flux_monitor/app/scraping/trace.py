@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ScrapeTrace:
+    phases: dict[str, float] = field(default_factory=dict)
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed_ms
+
+
+_current: ContextVar[ScrapeTrace | None] = ContextVar("flux_scrape_trace", default=None)
+
+
+def current_trace() -> ScrapeTrace | None:
+    return _current.get()
+
+
+@contextmanager
+def traced() -> Iterator[ScrapeTrace]:
+    active = _current.get()
+    if active is not None:
+        yield active
+        return
+
+    trace = ScrapeTrace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, (time.perf_counter() - started) * 1000)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import bindparam, func, literal_column, text, update
+
+from app.core import runtime
+from app.core.celery_app import celery_app
+from app.core.db import async_session_maker
+from app.core.settings import settings
+from app.models.product import Product
+
+
+logger = logging.getLogger(__name__)
+
+products = Product.__table__
+
+_ONE_SECOND = literal_column("interval '1 second'")
+
+_VOLATILITY_SQL = text(
+    """
+    WITH recent AS (
+        SELECT
+            r.product_id,
+            r.price,
+            r.currency,
+            r.observations,
+            COALESCE(r.last_seen_at, r."timestamp") AS seen_at,
+            lag(r.price) OVER w AS prev_price,
+            lag(r.currency) OVER w AS prev_currency
+        FROM price_records r
+        WHERE r."timestamp" >= now() - make_interval(secs => :window_s)
+        WINDOW w AS (PARTITION BY r.product_id ORDER BY r."timestamp", r.id)
+    )
+    SELECT
+        p.id AS product_id,
+        p.adaptive_interval_s,
+        p.interval_decided_at,
+        max(recent.seen_at) AS last_seen_at,
+        COALESCE(sum(recent.observations), 0) AS samples,
+        count(*) FILTER (
+            WHERE recent.prev_price IS NOT NULL
+            AND (recent.price <> recent.prev_price OR recent.currency <> recent.prev_currency)
+        ) AS changes
+    FROM products p
+    LEFT JOIN recent ON recent.product_id = p.id
+    WHERE p.interval_override_s IS NULL AND p.scrape_interval_s IS NULL
+    GROUP BY p.id, p.adaptive_interval_s, p.interval_decided_at
+    """
+)
+
+
+@dataclass(frozen=True)
+class IntervalDecision:
+    interval_s: int
+    reason: str
+
+
+def _clamp(interval_s: float) -> int:
+    return int(min(max(interval_s, settings.scrape_interval_min_s), settings.scrape_interval_max_s))
+
+
+def decide_interval(current_s: int | None, samples: int, changes: int, window_s: int) -> IntervalDecision:
+    current = _clamp(current_s or settings.scrape_interval_default_s)
+    window_h = window_s / 3600
+
+    if samples < settings.adaptive_min_samples:
+        return IntervalDecision(current, f"insufficient history: {samples} samples in {window_h:g}h")
+
+    if changes == 0:
+        reason = f"stable: no price changes in {samples} samples over {window_h:g}h"
+        return IntervalDecision(_clamp(current * 2), reason)
+
+    # Aim for several samples per observed change; tighten immediately, relax at most 2x per pass.
+    target = _clamp(window_s / (changes * settings.adaptive_samples_per_change))
+    interval = target if target <= current else min(target, _clamp(current * 2))
+    return IntervalDecision(interval, f"volatile: {changes} price changes in {samples} samples over {window_h:g}h")
+
+
+async def adapt_scrape_intervals(window_s: int) -> dict[str, int]:
+    async with async_session_maker() as session:
+        rows = (await session.execute(_VOLATILITY_SQL, {"window_s": float(window_s)})).all()
+
+        updates = []
+        tightened = 0
+        relaxed = 0
+        for row in rows:
+            # Without new observations the evidence is the same as last time; re-deciding would only keep
+            # relaxing the interval on every tick.
+            if row.interval_decided_at is not None and (
+                row.last_seen_at is None or row.last_seen_at <= row.interval_decided_at
+            ):
+                continue
+
+            decision = decide_interval(row.adaptive_interval_s, int(row.samples), int(row.changes), window_s)
+            current = row.adaptive_interval_s or settings.scrape_interval_default_s
+            tightened += decision.interval_s < current
+            relaxed += decision.interval_s > current
+            updates.append({"product_id": row.product_id, "interval_s": decision.interval_s, "reason": decision.reason})
+
+        if updates:
+            await session.execute(
+                update(products)
+                .where(products.c.id == bindparam("product_id"))
+                .values(
+                    adaptive_interval_s=bindparam("interval_s"),
+                    interval_reason=bindparam("reason"),
+                    interval_decided_at=func.now(),
+                    # A tighter interval takes effect now rather than after the old, longer wait.
+                    next_due_at=func.least(
+                        products.c.next_due_at,
+                        func.now() + bindparam("interval_s") * _ONE_SECOND,
+                    ),
+                ),
+                updates,
+            )
+        await session.commit()
+
+    return {"products": len(updates), "tightened": tightened, "relaxed": relaxed}
+
+
+@celery_app.task(bind=True, name="flux_monitor.adapt_intervals")
+def adapt_intervals(self) -> dict:
+    result = runtime.run(adapt_scrape_intervals(window_s=settings.adaptive_window_s))
+
+    logger.info(
+        "adaptive_intervals task_id=%s products=%s tightened=%s relaxed=%s",
+        getattr(self.request, "id", None),
+        result["products"],
+        result["tightened"],
+        result["relaxed"],
+    )
+    return result
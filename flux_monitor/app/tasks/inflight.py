@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from celery import Task
+
+from app.core.celery_app import scrape_time_limit_s
+from app.core.metrics import DUPLICATE_DISPATCHES_SUPPRESSED
+from app.core.redis import get_async_redis
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_KEY = "flux:inflight:{}"
+_STATS_KEY = "flux:inflight:stats"
+
+# Claims every key that is free for ARGV[1] (the task id) with a ttl of ARGV[2] ms and returns,
+# per key, the task id that already holds it or '' when this call claimed it.
+_CLAIM_LUA = """
+local holders = {}
+for i, key in ipairs(KEYS) do
+    if redis.call('SET', key, ARGV[1], 'NX', 'PX', ARGV[2]) then
+        holders[i] = ''
+    else
+        holders[i] = redis.call('GET', key) or ''
+    end
+end
+return holders
+"""
+
+# Moves keys still held by ARGV[1] to ARGV[2] with a fresh ttl of ARGV[3] ms, or releases them
+# when ARGV[2] is empty. Keys that expired or were claimed by another task are left alone.
+_HANDOVER_LUA = """
+local moved = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        if ARGV[2] == '' then
+            redis.call('DEL', key)
+        else
+            redis.call('SET', key, ARGV[2], 'PX', ARGV[3])
+        end
+        moved = moved + 1
+    end
+end
+return moved
+"""
+
+
+def inflight_ttl_s(task: Task, countdown_s: float = 0) -> int:
+    # Long enough for the task to wait in the queue, run to its hard time limit and report back;
+    # a worker killed mid-task simply lets the claim expire.
+    time_limit_s = task.time_limit or scrape_time_limit_s()
+    return int(countdown_s + time_limit_s + settings.inflight_queue_grace_s)
+
+
+class InflightRegistry:
+    def __init__(self) -> None:
+        self._claim_script = None
+        self._handover_script = None
+
+    async def claim(self, product_ids: list[int], task_id: str, ttl_s: float) -> dict[int, str]:
+        if not settings.inflight_dedupe_enabled or not product_ids:
+            return {}
+        if self._claim_script is None:
+            self._claim_script = get_async_redis().register_script(_CLAIM_LUA)
+
+        holders = await self._claim_script(
+            keys=[_KEY.format(product_id) for product_id in product_ids],
+            args=[task_id, int(ttl_s * 1000)],
+        )
+        return {product_id: holder for product_id, holder in zip(product_ids, holders) if holder}
+
+    async def handover(self, product_ids: list[int], from_task_id: str | None, to_task_id: str, ttl_s: float) -> None:
+        if not settings.inflight_dedupe_enabled or not product_ids or not from_task_id:
+            return
+        if self._handover_script is None:
+            self._handover_script = get_async_redis().register_script(_HANDOVER_LUA)
+
+        await self._handover_script(
+            keys=[_KEY.format(product_id) for product_id in product_ids],
+            args=[from_task_id, to_task_id, int(ttl_s * 1000)],
+        )
+
+    async def release(self, product_ids: list[int], task_id: str | None) -> None:
+        await self.handover(product_ids, task_id, "", 0)
+
+    async def record_suppressed(self, source: str, count: int) -> None:
+        if count <= 0:
+            return
+        DUPLICATE_DISPATCHES_SUPPRESSED.labels(source).inc(count)
+        await get_async_redis().hincrby(_STATS_KEY, source, count)
+        logger.info("dispatch_duplicates_suppressed source=%s count=%s", source, count)
+
+    async def stats(self) -> dict[str, Any]:
+        raw = await get_async_redis().hgetall(_STATS_KEY)
+        by_source = {source: int(count) for source, count in sorted(raw.items())}
+        return {"suppressed_duplicates": sum(by_source.values()), "by_source": by_source}
+
+
+_registry: InflightRegistry | None = None
+
+
+def get_inflight_registry() -> InflightRegistry:
+    global _registry
+    if _registry is None:
+        _registry = InflightRegistry()
+    return _registry
+
+
+def reset_inflight_registry() -> None:
+    global _registry
+    _registry = None
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from app.core import runtime
+from app.core.celery_app import celery_app
+from app.core.db import async_session_maker
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_NAME = re.compile(r"^price_records_(\d{4})_(\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def _list_partitions() -> list[str]:
+    async with async_session_maker() as session:
+        rows = await session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = 'price_records'::regclass"
+            )
+        )
+        return [row[0] for row in rows]
+
+
+async def maintain_price_partitions(months_ahead: int, retention_months: int) -> dict[str, object]:
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+
+    async with async_session_maker() as session:
+        created = await session.scalar(
+            text("SELECT flux_ensure_price_partitions(:from_month, :to_month)"),
+            {"from_month": this_month, "to_month": _add_months(this_month, max(0, months_ahead))},
+        )
+        await session.commit()
+
+    dropped: list[str] = []
+    if retention_months > 0:
+        cutoff = _add_months(this_month, -retention_months)
+        for name in sorted(await _list_partitions()):
+            match = _PARTITION_NAME.match(name)
+            if match is None or date(int(match.group(1)), int(match.group(2)), 1) >= cutoff:
+                continue
+
+            async with async_session_maker() as session:
+                await session.execute(text(f'ALTER TABLE price_records DETACH PARTITION "{name}"'))
+                await session.execute(text(f'DROP TABLE "{name}"'))
+                await session.commit()
+            dropped.append(name)
+
+    return {"created": int(created or 0), "dropped": dropped}
+
+
+@celery_app.task(bind=True, name="flux_monitor.maintain_partitions")
+def maintain_partitions(self) -> dict:
+    result = runtime.run(
+        maintain_price_partitions(
+            months_ahead=settings.price_partition_months_ahead,
+            retention_months=settings.price_retention_months,
+        )
+    )
+
+    logger.info(
+        "partition_maintenance task_id=%s created=%s dropped=%s",
+        getattr(self.request, "id", None),
+        result["created"],
+        ",".join(result["dropped"]) or "-",
+    )
+    return result
@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+from redis.exceptions import ResponseError
+from sqlalchemy import bindparam, case, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import runtime
+from app.core.cache import invalidate_price_history
+from app.core.celery_app import celery_app
+from app.core.db import async_session_maker
+from app.core.events import publish_price_events
+from app.core.redis import get_async_redis
+from app.core.settings import settings
+from app.models.price_record import PriceRecord
+from app.models.price_rollup import PriceRollupDay, PriceRollupHour
+
+
+logger = logging.getLogger(__name__)
+
+_STREAM_KEY = "flux:prices:pending"
+_GROUP = "price-writers"
+_FLUSH_SCHEDULED_KEY = "flux:prices:flush-scheduled"
+_STATS_KEY = "flux:prices:writer:stats"
+_DEAD_LETTER_KEY = "flux:prices:dead"
+
+# Errors caused by the rows themselves (e.g. a product deleted before the flush). Anything else, such as a
+# lost connection, leaves the batch pending so it is redelivered.
+_ROW_ERRORS = (IntegrityError, DataError)
+
+# pg_advisory_xact_lock(namespace, product_id) guards a product's current change_only run.
+_RUN_LOCK_NAMESPACE = 0x464C5852
+_LOCK_RUNS_SQL = text(
+    "SELECT pg_advisory_xact_lock(:namespace, id) "
+    "FROM (SELECT unnest(CAST(:ids AS integer[])) AS id ORDER BY id) AS ids"
+)
+
+price_records = PriceRecord.__table__
+
+
+@dataclass(frozen=True)
+class PriceObservation:
+    product_id: int
+    price: Decimal
+    currency: str
+    timestamp: datetime
+
+    def to_fields(self) -> dict[str, str]:
+        return {
+            "product_id": str(self.product_id),
+            "price": str(self.price),
+            "currency": self.currency,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+    @classmethod
+    def from_fields(cls, fields: dict[str, str]) -> PriceObservation:
+        return cls(
+            product_id=int(fields["product_id"]),
+            price=Decimal(fields["price"]),
+            currency=fields["currency"],
+            timestamp=datetime.fromisoformat(fields["timestamp"]),
+        )
+
+
+@dataclass
+class _PriceRun:
+    record_id: int | None
+    price: Decimal
+    currency: str
+    timestamp: datetime
+    last_seen_at: datetime
+    observations: int = 1
+    new_observations: int = 0
+
+    def extends(self, observation: PriceObservation) -> bool:
+        return (
+            self.price == observation.price
+            and self.currency == observation.currency
+            and observation.timestamp >= self.timestamp
+        )
+
+
+async def _lock_products(session: AsyncSession, product_ids: set[int]) -> None:
+    # Serialises change_only writers per product until commit. A FOR UPDATE on the current run
+    # would not cover a run another writer is about to insert, and DISTINCT ON rules it out anyway.
+    # Locks are taken in id order so concurrent flushes cannot deadlock.
+    await session.execute(_LOCK_RUNS_SQL, {"namespace": _RUN_LOCK_NAMESPACE, "ids": sorted(product_ids)})
+
+
+async def _current_runs(session: AsyncSession, product_ids: set[int]) -> dict[int, _PriceRun]:
+    await _lock_products(session, product_ids)
+    rows = await session.execute(
+        select(
+            PriceRecord.id,
+            PriceRecord.product_id,
+            PriceRecord.price,
+            PriceRecord.currency,
+            PriceRecord.timestamp,
+            PriceRecord.last_seen_at,
+            PriceRecord.observations,
+        )
+        .where(PriceRecord.product_id.in_(product_ids))
+        .distinct(PriceRecord.product_id)
+        .order_by(PriceRecord.product_id, PriceRecord.timestamp.desc(), PriceRecord.id.desc())
+    )
+    return {
+        row.product_id: _PriceRun(
+            record_id=row.id,
+            price=row.price,
+            currency=row.currency,
+            timestamp=row.timestamp,
+            last_seen_at=row.last_seen_at or row.timestamp,
+            observations=row.observations,
+        )
+        for row in rows
+    }
+
+
+async def _store_changes_only(session: AsyncSession, observations: Sequence[PriceObservation]) -> None:
+    runs = await _current_runs(session, {observation.product_id for observation in observations})
+
+    new_runs: list[tuple[int, _PriceRun]] = []
+    for observation in sorted(observations, key=lambda item: (item.product_id, item.timestamp)):
+        run = runs.get(observation.product_id)
+        if run is not None and run.extends(observation):
+            # Redelivered or late entries fall inside the run and must not start a duplicate one.
+            run.last_seen_at = max(run.last_seen_at, observation.timestamp)
+            run.new_observations += 1
+            continue
+
+        run = _PriceRun(
+            record_id=None,
+            price=observation.price,
+            currency=observation.currency,
+            timestamp=observation.timestamp,
+            last_seen_at=observation.timestamp,
+        )
+        runs[observation.product_id] = run
+        new_runs.append((observation.product_id, run))
+
+    extended = [run for run in runs.values() if run.record_id is not None and run.new_observations]
+    if extended:
+        await session.execute(
+            update(price_records)
+            .where(price_records.c.id == bindparam("record_id"))
+            .where(price_records.c.timestamp == bindparam("record_ts"))
+            .values(
+                last_seen_at=bindparam("seen_at"),
+                observations=price_records.c.observations + bindparam("added"),
+            ),
+            [
+                {
+                    "record_id": run.record_id,
+                    "record_ts": run.timestamp,
+                    "seen_at": run.last_seen_at,
+                    "added": run.new_observations,
+                }
+                for run in extended
+            ],
+        )
+
+    if new_runs:
+        await session.execute(
+            insert(PriceRecord),
+            [
+                {
+                    "product_id": product_id,
+                    "price": run.price,
+                    "currency": run.currency,
+                    "timestamp": run.timestamp,
+                    "last_seen_at": run.last_seen_at,
+                    "observations": run.observations + run.new_observations,
+                }
+                for product_id, run in new_runs
+            ],
+        )
+
+
+def _hour_bucket(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _day_bucket(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+_ROLLUPS = (
+    (PriceRollupHour, _hour_bucket),
+    (PriceRollupDay, _day_bucket),
+)
+
+
+def _rollup_rows(
+    observations: Sequence[PriceObservation],
+    bucket_of: Callable[[datetime], datetime],
+) -> list[dict[str, Any]]:
+    rows: dict[tuple[int, datetime, str], dict[str, Any]] = {}
+    for observation in sorted(observations, key=lambda item: item.timestamp):
+        moment = observation.timestamp.astimezone(timezone.utc)
+        key = (observation.product_id, bucket_of(moment), observation.currency)
+
+        row = rows.get(key)
+        if row is None:
+            rows[key] = {
+                "product_id": observation.product_id,
+                "bucket": key[1],
+                "currency": observation.currency,
+                "open": observation.price,
+                "high": observation.price,
+                "low": observation.price,
+                "close": observation.price,
+                "count": 1,
+                "open_at": moment,
+                "close_at": moment,
+            }
+            continue
+
+        row["high"] = max(row["high"], observation.price)
+        row["low"] = min(row["low"], observation.price)
+        row["close"] = observation.price
+        row["close_at"] = moment
+        row["count"] += 1
+
+    return [rows[key] for key in sorted(rows)]
+
+
+async def _update_rollups(session: AsyncSession, observations: Sequence[PriceObservation]) -> None:
+    for model, bucket_of in _ROLLUPS:
+        table = model.__table__
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.product_id, table.c.bucket, table.c.currency],
+            set_={
+                "open": case((stmt.excluded.open_at < table.c.open_at, stmt.excluded.open), else_=table.c.open),
+                "open_at": func.least(table.c.open_at, stmt.excluded.open_at),
+                "close": case((stmt.excluded.close_at >= table.c.close_at, stmt.excluded.close), else_=table.c.close),
+                "close_at": func.greatest(table.c.close_at, stmt.excluded.close_at),
+                "high": func.greatest(table.c.high, stmt.excluded.high),
+                "low": func.least(table.c.low, stmt.excluded.low),
+                "count": table.c.count + stmt.excluded.count,
+            },
+        )
+        await session.execute(stmt, _rollup_rows(observations, bucket_of))
+
+
+async def store_prices(observations: Sequence[PriceObservation]) -> int:
+    if not observations:
+        return 0
+
+    async with async_session_maker() as session:
+        if settings.price_storage_mode == "change_only":
+            await _store_changes_only(session, observations)
+        else:
+            await session.execute(
+                insert(PriceRecord),
+                [
+                    {
+                        "product_id": observation.product_id,
+                        "price": observation.price,
+                        "currency": observation.currency,
+                        "timestamp": observation.timestamp,
+                    }
+                    for observation in observations
+                ],
+            )
+        if settings.price_rollups_enabled:
+            await _update_rollups(session, observations)
+        await session.commit()
+
+    await invalidate_price_history(observation.product_id for observation in observations)
+    await publish_price_events(observation.to_fields() for observation in observations)
+
+    return len(observations)
+
+
+async def record_price(observation: PriceObservation) -> None:
+    if settings.price_write_mode != "buffered":
+        await store_prices([observation])
+        return
+
+    redis = get_async_redis()
+    await redis.xadd(_STREAM_KEY, observation.to_fields())
+
+    if await redis.xlen(_STREAM_KEY) < settings.price_flush_batch_size:
+        return
+
+    if await redis.set(_FLUSH_SCHEDULED_KEY, "1", nx=True, ex=max(1, int(settings.price_flush_interval_s))):
+        await asyncio.to_thread(flush_prices.delay)
+
+
+async def _ensure_group() -> None:
+    try:
+        await get_async_redis().xgroup_create(_STREAM_KEY, _GROUP, id="0", mkstream=True)
+    except ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+async def _record_flush_stats(batch_size: int, latency_ms: float) -> None:
+    redis = get_async_redis()
+    pipe = redis.pipeline(transaction=False)
+    pipe.hincrby(_STATS_KEY, "flushes", 1)
+    pipe.hincrby(_STATS_KEY, "rows", batch_size)
+    pipe.hincrbyfloat(_STATS_KEY, "flush_ms_total", latency_ms)
+    pipe.hset(_STATS_KEY, mapping={"last_batch_size": batch_size, "last_flush_ms": round(latency_ms, 3)})
+    await pipe.execute()
+
+    max_batch = await redis.hget(_STATS_KEY, "max_batch_size")
+    if max_batch is None or batch_size > int(max_batch):
+        await redis.hset(_STATS_KEY, "max_batch_size", batch_size)
+
+
+async def _dead_letter(entry_id: str, fields: dict[str, str] | None, reason: str) -> None:
+    reason = " ".join(reason.split())
+    redis = get_async_redis()
+    await redis.xadd(
+        _DEAD_LETTER_KEY,
+        {**(fields or {}), "entry_id": entry_id, "error": reason[:500]},
+        maxlen=settings.price_dead_letter_maxlen,
+        approximate=True,
+    )
+    await redis.hincrby(_STATS_KEY, "dead_lettered", 1)
+    logger.error("price_buffer_entry_dead_lettered entry_id=%s err=%s", entry_id, reason)
+
+
+async def _store_one_by_one(entries: list[tuple[str, dict[str, str], PriceObservation]]) -> int:
+    stored = 0
+    for entry_id, fields, observation in entries:
+        try:
+            stored += await store_prices([observation])
+        except _ROW_ERRORS as exc:
+            await _dead_letter(entry_id, fields, str(exc.orig or exc))
+    return stored
+
+
+async def _flush_entries(entries: list[tuple[str, dict[str, str] | None]]) -> int:
+    redis = get_async_redis()
+    ids = [entry_id for entry_id, _ in entries]
+
+    parsed: list[tuple[str, dict[str, str], PriceObservation]] = []
+    for entry_id, fields in entries:
+        if not fields:
+            continue
+        try:
+            parsed.append((entry_id, fields, PriceObservation.from_fields(fields)))
+        except (KeyError, ValueError, ArithmeticError) as exc:
+            await _dead_letter(entry_id, fields, str(exc))
+
+    started = time.perf_counter()
+    try:
+        stored = await store_prices([observation for _, _, observation in parsed])
+    except _ROW_ERRORS as exc:
+        logger.warning("price_flush_batch_rejected batch_size=%s err=%s", len(parsed), str(exc.orig or exc))
+        stored = await _store_one_by_one(parsed)
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    await redis.xack(_STREAM_KEY, _GROUP, *ids)
+    await redis.xdel(_STREAM_KEY, *ids)
+    await _record_flush_stats(stored, latency_ms)
+
+    logger.info("price_flush batch_size=%s latency_ms=%.1f", stored, latency_ms)
+    return stored
+
+
+async def _drop_over_delivered(
+    entries: list[tuple[str, dict[str, str] | None]],
+) -> list[tuple[str, dict[str, str] | None]]:
+    if not entries:
+        return entries
+
+    redis = get_async_redis()
+    pending = await redis.xpending_range(
+        _STREAM_KEY,
+        _GROUP,
+        min=entries[0][0],
+        max=entries[-1][0],
+        count=len(entries),
+    )
+    deliveries = {item["message_id"]: item["times_delivered"] for item in pending}
+
+    kept: list[tuple[str, dict[str, str] | None]] = []
+    for entry_id, fields in entries:
+        delivered = deliveries.get(entry_id, 0)
+        if delivered <= settings.price_buffer_max_deliveries:
+            kept.append((entry_id, fields))
+            continue
+        await _dead_letter(entry_id, fields, f"delivered {delivered} times")
+        await redis.xack(_STREAM_KEY, _GROUP, entry_id)
+        await redis.xdel(_STREAM_KEY, entry_id)
+    return kept
+
+
+async def flush_price_buffer(batch_size: int, max_batches: int) -> dict[str, int]:
+    redis = get_async_redis()
+    await _ensure_group()
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+    claimed = await redis.xautoclaim(
+        _STREAM_KEY,
+        _GROUP,
+        consumer,
+        min_idle_time=int(settings.price_buffer_claim_idle_s * 1000),
+        start_id="0-0",
+        count=batch_size,
+    )
+    entries = await _drop_over_delivered(claimed[1])
+
+    rows = 0
+    batches = 0
+    while batches < max_batches:
+        if not entries:
+            response = await redis.xreadgroup(_GROUP, consumer, {_STREAM_KEY: ">"}, count=batch_size)
+            entries = response[0][1] if response else []
+        if not entries:
+            break
+
+        rows += await _flush_entries(entries)
+        batches += 1
+        entries = []
+
+    return {"rows": rows, "batches": batches}
+
+
+async def price_writer_stats() -> dict[str, Any]:
+    redis = get_async_redis()
+    raw = await redis.hgetall(_STATS_KEY)
+    stats: dict[str, Any] = {key: float(value) if "_ms" in key else int(value) for key, value in raw.items()}
+
+    flushes = stats.get("flushes", 0)
+    stats["avg_batch_size"] = round(stats.get("rows", 0) / flushes, 2) if flushes else None
+    stats["avg_flush_ms"] = round(stats.get("flush_ms_total", 0.0) / flushes, 3) if flushes else None
+    stats["pending"] = await redis.xlen(_STREAM_KEY)
+    stats["dead_letter"] = await redis.xlen(_DEAD_LETTER_KEY)
+    stats["mode"] = settings.price_write_mode
+    return stats
+
+
+async def _flush_scheduled() -> dict[str, int]:
+    await get_async_redis().delete(_FLUSH_SCHEDULED_KEY)
+    return await flush_price_buffer(
+        batch_size=settings.price_flush_batch_size,
+        max_batches=settings.price_flush_max_batches,
+    )
+
+
+@celery_app.task(bind=True, name="flux_monitor.flush_prices")
+def flush_prices(self) -> dict:
+    result = runtime.run(_flush_scheduled())
+
+    if result["rows"]:
+        logger.info(
+            "price_flush_done task_id=%s rows=%s batches=%s",
+            getattr(self.request, "id", None),
+            result["rows"],
+            result["batches"],
+        )
+    return result
@@ -2,17 +2,25 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 
-from sqlalchemy import select
+from celery import Signature, group, uuid
+from sqlalchemy import case, func, literal_column, select, update
 
+from app.core import runtime
 from app.core.db import async_session_maker
 from app.core.celery_app import celery_app
+from app.core.settings import settings
 from app.models.product import Product
-from app.tasks.scrape import scrape_product
+from app.tasks.inflight import get_inflight_registry, inflight_ttl_s
+from app.tasks.scrape import scrape_batch, scrape_product
 
 
 logger = logging.getLogger(__name__)
 
+_ONE_SECOND = literal_column("interval '1 second'")
+
 
 async def _get_all_product_ids() -> list[int]:
     async with async_session_maker() as session:
@@ -20,14 +28,161 @@ async def _get_all_product_ids() -> list[int]:
         return list(ids.all())
 
 
+async def _claim_due_products(limit: int) -> list[int]:
+    due = (
+        select(Product.id)
+        .where(Product.next_due_at <= func.now())
+        .order_by(Product.next_due_at.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .cte("due")
+    )
+    interval = (
+        func.coalesce(
+            Product.interval_override_s,
+            Product.scrape_interval_s,
+            Product.adaptive_interval_s,
+            settings.scrape_interval_default_s,
+        )
+        * _ONE_SECOND
+    )
+    on_schedule = Product.next_due_at + interval
+
+    async with async_session_maker() as session:
+        claimed = await session.scalars(
+            update(Product)
+            .where(Product.id == due.c.id)
+            .values(next_due_at=case((on_schedule > func.now(), on_schedule), else_=func.now() + interval))
+            .returning(Product.id)
+        )
+        product_ids = sorted(claimed.all())
+        await session.commit()
+    return product_ids
+
+
+@dataclass
+class ScrapeDispatch:
+    task_ids: dict[int, str] = field(default_factory=dict)
+    duplicates: dict[int, str] = field(default_factory=dict)
+    batches: int = 0
+    group_id: str | None = None
+
+    @property
+    def dispatched(self) -> int:
+        return len(self.task_ids) - len(self.duplicates)
+
+
+async def _claim_signatures(product_ids: list[int], plan: ScrapeDispatch, batched: bool) -> list[Signature]:
+    registry = get_inflight_registry()
+    signatures: list[Signature] = []
+
+    if batched and settings.scrape_batch_size > 1:
+        for chunk in chunked(product_ids, settings.scrape_batch_size):
+            task_id = uuid()
+            duplicates = await registry.claim(chunk, task_id, inflight_ttl_s(scrape_batch))
+            fresh = [pid for pid in chunk if pid not in duplicates]
+            if fresh:
+                signatures.append(scrape_batch.signature((fresh,), task_id=task_id))
+                plan.task_ids.update(dict.fromkeys(fresh, task_id))
+            plan.duplicates.update(duplicates)
+        plan.batches = len(signatures)
+    else:
+        ttl_s = inflight_ttl_s(scrape_product)
+        for pid in product_ids:
+            task_id = uuid()
+            duplicates = await registry.claim([pid], task_id, ttl_s)
+            if duplicates:
+                plan.duplicates.update(duplicates)
+            else:
+                signatures.append(scrape_product.signature((pid,), task_id=task_id))
+                plan.task_ids[pid] = task_id
+
+    plan.task_ids.update(plan.duplicates)
+    return signatures
+
+
+def _publish(signatures: list[Signature], as_group: bool) -> str | None:
+    if as_group:
+        return group(signatures).apply_async().id
+    for signature in signatures:
+        signature.apply_async()
+    return None
+
+
+async def dispatch_scrapes(
+    product_ids: list[int],
+    source: str,
+    batched: bool = True,
+    as_group: bool = False,
+) -> ScrapeDispatch:
+    plan = ScrapeDispatch()
+    registry = get_inflight_registry()
+    signatures = await _claim_signatures(product_ids, plan, batched)
+    await registry.record_suppressed(source, len(plan.duplicates))
+    if not signatures:
+        return plan
+
+    try:
+        plan.group_id = await asyncio.to_thread(_publish, signatures, as_group)
+    except Exception:
+        claimed: dict[str, list[int]] = {}
+        for pid, task_id in plan.task_ids.items():
+            if pid not in plan.duplicates:
+                claimed.setdefault(task_id, []).append(pid)
+        for task_id, pids in claimed.items():
+            await registry.release(pids, task_id)
+        raise
+    return plan
+
+
+def chunked(items: list[int], size: int) -> Iterator[list[int]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
 @celery_app.task(bind=True, name="flux_monitor.scrape_all_products")
 def scrape_all_products(self) -> dict:
-    product_ids = asyncio.run(_get_all_product_ids())
+    product_ids = runtime.run(_get_all_product_ids())
+
+    plan = runtime.run(dispatch_scrapes(product_ids, source="scrape_all"))
+
+    logger.info(
+        "scrape_all_dispatched task_id=%s count=%s batches=%s duplicates=%s",
+        getattr(self.request, "id", None),
+        plan.dispatched,
+        plan.batches,
+        len(plan.duplicates),
+    )
+    return {"dispatched": plan.dispatched, "batches": plan.batches, "duplicates": len(plan.duplicates)}
+
+
+@celery_app.task(bind=True, name="flux_monitor.dispatch_due_products")
+def dispatch_due_products(self) -> dict:
+    chunk_size = max(1, settings.scheduler_claim_chunk_size)
 
     dispatched = 0
-    for pid in product_ids:
-        scrape_product.delay(pid)
-        dispatched += 1
+    batches = 0
+    duplicates = 0
+    while dispatched < settings.scheduler_max_claims_per_tick:
+        product_ids = runtime.run(
+            _claim_due_products(min(chunk_size, settings.scheduler_max_claims_per_tick - dispatched))
+        )
+        if not product_ids:
+            break
+
+        plan = runtime.run(dispatch_scrapes(product_ids, source="schedule"))
+        batches += plan.batches
+        duplicates += len(plan.duplicates)
+        dispatched += len(product_ids)
+        if len(product_ids) < chunk_size:
+            break
 
-    logger.info("scrape_all_dispatched task_id=%s count=%s", getattr(self.request, "id", None), dispatched)
-    return {"dispatched": dispatched}
+    if dispatched:
+        logger.info(
+            "due_products_dispatched task_id=%s count=%s batches=%s duplicates=%s",
+            getattr(self.request, "id", None),
+            dispatched - duplicates,
+            batches,
+            duplicates,
+        )
+    return {"dispatched": dispatched - duplicates, "batches": batches, "duplicates": duplicates}
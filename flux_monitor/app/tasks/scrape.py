@@ -4,27 +4,76 @@ import asyncio
 import logging
 import random
 import re
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
 
-from celery import Task
+from celery import Task, uuid
+from celery.signals import worker_process_init, worker_process_shutdown
+from playwright.async_api import Error as PlaywrightError
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
-from playwright.async_api import async_playwright
+from redis.exceptions import RedisError
 from sqlalchemy import select
 
-from app.core.celery_app import celery_app
-from app.core.db import async_session_maker
-from app.models.price_record import PriceRecord
+from app.core import runtime
+from app.core.celery_app import QUEUE_BROWSER, browser_enabled, celery_app
+from app.core.db import async_session_maker, dispose_engine, forget_inherited_connections
+from app.core.metrics import CIRCUIT_BREAKER_REJECTIONS, observe_scrape
+from app.core.redis import close_async_redis, reset_redis
+from app.core.settings import settings
 from app.models.product import Product
+from app.scraping.blocking import get_resource_blocker
+from app.scraping.browser_pool import get_browser_pool, reset_browser_pool
+from app.scraping.circuit_breaker import BreakerPermit, CircuitOpen, get_circuit_breaker, reset_circuit_breaker
+from app.scraping.conditional import ConditionalState, get_conditional_store, region_fingerprint
+from app.scraping.http_fetch import (
+    StaticFetchError,
+    StaticFetchResult,
+    check_page_unchanged,
+    close_http_client,
+    fetch_static_price_text,
+    reset_http_client,
+)
+from app.scraping.rate_limit import RateLimited, domain_of, get_rate_limiter, reset_rate_limiter
+from app.scraping.selector_cache import get_selector_cache
+from app.scraping.page_extract import extract_price_in_page
+from app.scraping.selectors import PriceExtraction, ordered_selectors
+from app.scraping.strategy import BrowserRequired, FetchStrategy, get_fetch_strategy, remember_static_result
+from app.scraping.trace import phase, traced
+from app.tasks.inflight import get_inflight_registry, inflight_ttl_s, reset_inflight_registry
+from app.tasks.persist import PriceObservation, record_price
 
 
 logger = logging.getLogger(__name__)
 
+_USER_AGENT = "FluxMonitor/1.0 (+https://example.local)"
+_MAX_RETRIES = 5
+
+# Statuses that mean the site is refusing or unable to serve us, as opposed to a page we failed to read.
+_UNAVAILABLE_STATUSES = frozenset({403, 429})
+
+
+# Time a batch keeps back from its soft time limit to record results and hand the rest on.
+_BATCH_WRAP_UP_S = 15
+
+
+class BatchDeadlineExceeded(Exception):
+    pass
+
+
+class PageUnavailable(Exception):
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f"{url} returned HTTP {status}")
+        self.url = url
+        self.status = status
+
 
 @dataclass(frozen=True)
 class ParsedPrice:
     amount: Decimal
     currency: str
+    unchanged: bool = False
 
 
 _CURRENCY_SYMBOLS: dict[str, str] = {
@@ -51,15 +100,18 @@ def _normalize_number(raw: str) -> Decimal:
         raise ValueError(f"Failed to parse numeric value from '{raw}' -> '{s}'") from exc
 
 
-def parse_price(text: str) -> ParsedPrice:
+def parse_price(text: str, currency_hint: str | None = None) -> ParsedPrice:
     if not text or not text.strip():
         raise ValueError("Empty price text")
 
     currency = "USD"
-    for symbol, code in _CURRENCY_SYMBOLS.items():
-        if symbol in text:
-            currency = code
-            break
+    if currency_hint and re.fullmatch(r"[A-Za-z]{3}", currency_hint.strip()):
+        currency = currency_hint.strip().upper()
+    else:
+        for symbol, code in _CURRENCY_SYMBOLS.items():
+            if symbol in text:
+                currency = code
+                break
 
     m = re.search(r"([0-9][0-9\.,\s\u00a0]*)", text)
     if not m:
@@ -69,87 +121,471 @@ def parse_price(text: str) -> ParsedPrice:
     return ParsedPrice(amount=amount, currency=currency)
 
 
-async def _extract_price_text(page, selector_override: str | None) -> str:
-    selectors: list[str] = []
-    if selector_override:
-        selectors.append(selector_override)
-
-    selectors.extend(
-        [
-            '[itemprop="price"]',
-            'meta[property="product:price:amount"]',
-            'meta[name="product:price:amount"]',
-            '[data-test*="price" i]',
-            '[class*="price" i]',
-        ]
-    )
+async def _extract_price_text(
+    page,
+    selector_override: str | None,
+    preferred_selector: str | None = None,
+) -> PriceExtraction:
+    started = time.perf_counter()
+    selectors = ordered_selectors(selector_override, preferred_selector)
 
-    for selector in selectors:
+    extraction = await extract_price_in_page(page, selectors, wait_ms=settings.price_wait_timeout_ms)
+    if extraction is None and selector_override:
+        # price_selector may use Playwright-only syntax (text=, >>) that querySelector rejects.
         try:
-            if selector.startswith("meta"):
-                value = await page.locator(selector).first.get_attribute("content")
-                if value:
-                    return value
-
-            text = await page.locator(selector).first.inner_text(timeout=1500)
-            if text and text.strip():
-                return text
+            text = await page.locator(selector_override).first.inner_text(timeout=1500)
         except Exception:
-            continue
+            text = None
+        if text and text.strip():
+            extraction = PriceExtraction(text, selector_override, misses=len(selectors))
 
-    body_text = await page.locator("body").inner_text(timeout=2000)
-    for pattern in [
-        r"\$\s?[0-9][0-9\.,]*",
-        r"€\s?[0-9][0-9\.,]*",
-        r"£\s?[0-9][0-9\.,]*",
-    ]:
-        m = re.search(pattern, body_text)
-        if m:
-            return m.group(0)
+    if extraction is None:
+        raise ValueError("Unable to locate price on page")
 
-    raise ValueError("Unable to locate price on page")
+    if extraction.misses:
+        extraction = replace(extraction, miss_seconds=time.perf_counter() - started)
+    return extraction
 
 
-async def _scrape_and_persist(product_id: int, user_agent: str, politeness_delay_s: tuple[float, float]) -> ParsedPrice:
+async def _load_product(product_id: int) -> Product:
     async with async_session_maker() as session:
         product = await session.scalar(select(Product).where(Product.id == product_id))
         if not product:
             raise ValueError(f"Product not found: {product_id}")
+        return product
+
 
-        delay = random.uniform(*politeness_delay_s)
-        await asyncio.sleep(delay)
+async def _fetch_price_with_browser(
+    product: Product,
+    user_agent: str,
+    preferred_selector: str | None,
+) -> tuple[PriceExtraction, ParsedPrice]:
+    async with get_browser_pool().context(user_agent=user_agent) as context:
+        blocking = None
+        if settings.resource_blocking_enabled:
+            blocking = await get_resource_blocker().attach(context, domain_of(product.url))
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(user_agent=user_agent)
+        with phase("navigate"):
             page = await context.new_page()
+            response = await page.goto(product.url, wait_until="domcontentloaded", timeout=45000)
+            if response is not None and (response.status >= 500 or response.status in _UNAVAILABLE_STATUSES):
+                raise PageUnavailable(product.url, response.status)
+            await page.wait_for_timeout(500)
+        with phase("extract"):
+            extraction = await _extract_price_text(page, product.price_selector, preferred_selector)
+        if blocking is not None:
+            await blocking.settle()
+
+    if blocking is not None:
+        logger.info("scrape_resources product_id=%s %s", product.id, blocking.as_log())
+
+    return extraction, parse_price(extraction.text, extraction.currency)
+
+
+def _transfer_counters(page: StaticFetchResult) -> dict[str, int]:
+    if page.not_modified:
+        return {"bytes_saved": page.size}
+    return {"bytes_received": page.size}
+
+
+async def _record_unchanged(
+    product: Product,
+    domain: str,
+    previous: ConditionalState,
+    page: StaticFetchResult,
+    tier: FetchStrategy,
+) -> ParsedPrice:
+    reason = "not_modified" if page.not_modified else "fingerprint"
+    counters = _transfer_counters(page)
+    if tier is FetchStrategy.HTTP:
+        counters["http_fetches"] = 1
+        counters["http_not_modified" if page.not_modified else "http_fingerprint_matches"] = 1
+    else:
+        counters.update({"preflights": 1, "renders_skipped": 1})
+
+    store = get_conditional_store()
+    await store.save(
+        product.id,
+        replace(previous, etag=page.etag, last_modified=page.last_modified, body_hash=page.body_hash, size=page.size),
+    )
+    await store.record(domain, **counters)
+
+    logger.info("scrape_unchanged product_id=%s domain=%s tier=%s reason=%s", product.id, domain, tier.value, reason)
+    return ParsedPrice(amount=Decimal(previous.price or "0"), currency=previous.currency or "USD", unchanged=True)
+
+
+async def _remember_page(
+    product: Product,
+    domain: str,
+    previous: ConditionalState,
+    page: StaticFetchResult | None,
+    extraction: PriceExtraction,
+    parsed: ParsedPrice,
+    **counters: float,
+) -> ParsedPrice:
+    # The body hash only skips byte-identical pages; pages with per-request noise (tokens,
+    # timestamps, recommendations) are still parsed, and the price region decides whether they changed.
+    region_hash = region_fingerprint(extraction)
+    region_unchanged = region_hash == previous.region_hash
+    if previous.region_hash is not None:
+        counters["region_unchanged" if region_unchanged else "region_changed"] = 1
+    if page is not None:
+        counters.update(_transfer_counters(page))
+
+    store = get_conditional_store()
+    await store.save(
+        product.id,
+        ConditionalState(
+            etag=page.etag if page is not None else None,
+            last_modified=page.last_modified if page is not None else None,
+            body_hash=page.body_hash if page is not None else None,
+            region_hash=region_hash,
+            size=page.size if page is not None else 0,
+            price=str(parsed.amount),
+            currency=parsed.currency,
+        ),
+    )
+    await store.record(domain, **counters)
+
+    if not region_unchanged:
+        return parsed
+    logger.info("scrape_unchanged product_id=%s domain=%s reason=region", product.id, domain)
+    return replace(parsed, unchanged=True)
+
+
+async def _fetch_price(product: Product, user_agent: str) -> ParsedPrice:
+    domain = domain_of(product.url)
+    strategy = await get_fetch_strategy(domain, product.id) if settings.static_fetch_enabled else FetchStrategy.BROWSER
+
+    selector_cache = get_selector_cache()
+    cached = await selector_cache.lookup(product.id, domain)
+    preferred_selector = cached.selector if cached else None
+
+    previous = await get_conditional_store().load(product.id) if settings.conditional_fetch_enabled else None
+    reusable = previous if previous is not None and previous.reusable else None
+
+    if strategy is not FetchStrategy.BROWSER:
+        try:
+            page = await fetch_static_price_text(
+                product.url,
+                product.price_selector,
+                user_agent,
+                preferred_selector,
+                reusable,
+            )
+            if page.unchanged and reusable is not None:
+                return await _record_unchanged(product, domain, reusable, page, FetchStrategy.HTTP)
+            if page.extraction is None:
+                raise StaticFetchError("Static fetch returned no extraction")
+            extraction = page.extraction
+            parsed = parse_price(extraction.text, extraction.currency)
+        except (StaticFetchError, ValueError) as exc:
+            logger.info(
+                "static_fetch_fallback product_id=%s domain=%s err=%s",
+                product.id,
+                domain,
+                str(exc),
+            )
+        else:
+            await remember_static_result(domain, product.id, ok=True)
+            await selector_cache.observe(
+                product_id=product.id,
+                domain=domain,
+                cached=cached,
+                extraction=extraction,
+                selector_override=product.price_selector,
+                tier=FetchStrategy.HTTP.value,
+            )
+            if previous is not None:
+                return await _remember_page(
+                    product,
+                    domain,
+                    previous,
+                    page,
+                    extraction,
+                    parsed,
+                    http_fetches=1,
+                    parses=1,
+                    parse_ms_total=page.parse_ms,
+                )
+            return parsed
+
+    if not browser_enabled():
+        raise BrowserRequired(domain)
+
+    preflight = None
+    if reusable is not None and settings.conditional_browser_preflight:
+        try:
+            preflight = await check_page_unchanged(product.url, user_agent, reusable)
+        except StaticFetchError as exc:
+            logger.info("conditional_preflight_failed product_id=%s domain=%s err=%s", product.id, domain, str(exc))
+        else:
+            if preflight.unchanged:
+                return await _record_unchanged(product, domain, reusable, preflight, FetchStrategy.BROWSER)
+
+    started = time.perf_counter()
+    extraction, parsed = await _fetch_price_with_browser(product, user_agent, preferred_selector)
+    render_ms = (time.perf_counter() - started) * 1000
+
+    if strategy is not FetchStrategy.BROWSER:
+        await remember_static_result(domain, product.id, ok=False)
+    await selector_cache.observe(
+        product_id=product.id,
+        domain=domain,
+        cached=cached,
+        extraction=extraction,
+        selector_override=product.price_selector,
+        tier=FetchStrategy.BROWSER.value,
+    )
+    if previous is not None:
+        return await _remember_page(
+            product,
+            domain,
+            previous,
+            preflight,
+            extraction,
+            parsed,
+            preflights=int(preflight is not None),
+            browser_renders=1,
+            render_ms_total=render_ms,
+        )
+    return parsed
+
+
+def _scrape_outcome(exc: BaseException) -> str:
+    if isinstance(exc, CircuitOpen):
+        return "circuit_open"
+    if isinstance(exc, RateLimited):
+        return "rate_limited"
+    if isinstance(exc, BrowserRequired):
+        return "escalated"
+    if isinstance(exc, PlaywrightTimeoutError):
+        return "timeout"
+    if isinstance(exc, PageUnavailable):
+        return "unavailable"
+    return "error"
+
+
+def _is_transport_failure(exc: BaseException) -> bool:
+    # Only the domain misbehaving should trip its breaker; a selector or parse miss says nothing about its health.
+    if isinstance(exc, (PlaywrightTimeoutError, PageUnavailable, OSError)):
+        return True
+    return isinstance(exc, PlaywrightError) and "net::ERR_" in str(exc)
+
+
+async def _scrape_and_persist(
+    product_id: int,
+    user_agent: str,
+    fetch_slot: asyncio.Semaphore | None = None,
+) -> ParsedPrice:
+    with traced() as trace:
+        domain = ""
+        started = time.perf_counter()
+        try:
+            with phase("load"):
+                product = await _load_product(product_id)
+            domain = domain_of(product.url)
+            parsed = await _scrape_loaded(product, user_agent, fetch_slot)
+        except Exception as exc:
+            observe_scrape(domain, _scrape_outcome(exc), time.perf_counter() - started, trace.phases)
+            raise
+
+        observe_scrape(domain, "unchanged" if parsed.unchanged else "ok", time.perf_counter() - started, trace.phases)
+        return parsed
+
 
-            try:
-                await page.goto(product.url, wait_until="domcontentloaded", timeout=45000)
-                await page.wait_for_timeout(500)
-                price_text = await _extract_price_text(page, product.price_selector)
-            finally:
-                await context.close()
-                await browser.close()
+async def _check_breaker(domain: str) -> None:
+    if not settings.circuit_breaker_enabled or not domain:
+        return
+    try:
+        await get_circuit_breaker().check(domain)
+    except CircuitOpen:
+        CIRCUIT_BREAKER_REJECTIONS.labels(domain).inc()
+        raise
+
+
+async def _acquire_breaker(domain: str) -> BreakerPermit | None:
+    if not settings.circuit_breaker_enabled or not domain:
+        return None
+    try:
+        return await get_circuit_breaker().acquire(domain)
+    except CircuitOpen:
+        CIRCUIT_BREAKER_REJECTIONS.labels(domain).inc()
+        raise
 
-        parsed = parse_price(price_text)
 
-        session.add(
-            PriceRecord(
+async def _fetch_with_breaker(product: Product, user_agent: str, domain: str) -> ParsedPrice:
+    # Taken only once the request is about to go out, so a half-open probe lease is never spent
+    # waiting for a rate limit token or a fetch slot.
+    permit = await _acquire_breaker(domain)
+    try:
+        parsed = await _fetch_price(product, user_agent)
+    except (BrowserRequired, asyncio.CancelledError):
+        if permit is not None:
+            await get_circuit_breaker().release(permit)
+        raise
+    except Exception as exc:
+        if permit is not None:
+            await get_circuit_breaker().record(permit, success=not _is_transport_failure(exc))
+        raise
+    if permit is not None:
+        await get_circuit_breaker().record(permit, success=True)
+    return parsed
+
+
+async def _fetch_guarded(
+    product: Product,
+    user_agent: str,
+    fetch_slot: asyncio.Semaphore | None,
+    domain: str,
+) -> ParsedPrice:
+    if fetch_slot is None:
+        return await _fetch_with_breaker(product, user_agent, domain)
+
+    with phase("slot_wait"):
+        await fetch_slot.acquire()
+    try:
+        return await _fetch_with_breaker(product, user_agent, domain)
+    finally:
+        fetch_slot.release()
+
+
+async def _scrape_loaded(
+    product: Product,
+    user_agent: str,
+    fetch_slot: asyncio.Semaphore | None,
+) -> ParsedPrice:
+    domain = domain_of(product.url)
+    if not browser_enabled() and (
+        not settings.static_fetch_enabled or await get_fetch_strategy(domain, product.id) is FetchStrategy.BROWSER
+    ):
+        # Hand products known to need a browser over before spending a rate limit token here.
+        raise BrowserRequired(domain)
+
+    # Fail fast on an open breaker before waiting for (and spending) a rate limit token.
+    await _check_breaker(domain)
+    with phase("rate_limit"):
+        await get_rate_limiter().acquire(product.url)
+    parsed = await _fetch_guarded(product, user_agent, fetch_slot, domain)
+
+    with phase("persist"):
+        await record_price(
+            PriceObservation(
                 product_id=product.id,
                 price=parsed.amount,
                 currency=parsed.currency,
+                timestamp=datetime.now(timezone.utc),
             )
         )
-        await session.commit()
 
-        return parsed
+    return parsed
 
 
 class FluxTask(Task):
     autoretry_for = ()
 
 
+@worker_process_init.connect
+def _init_worker_process(**_: object) -> None:
+    runtime.start()
+    forget_inherited_connections()
+    reset_redis()
+    reset_rate_limiter()
+    reset_circuit_breaker()
+    reset_inflight_registry()
+    reset_http_client()
+    reset_browser_pool()
+    runtime.on_shutdown(dispose_engine)
+    runtime.on_shutdown(close_async_redis)
+    runtime.on_shutdown(close_http_client)
+    if not browser_enabled():
+        return
+
+    pool = get_browser_pool()
+    runtime.on_shutdown(pool.close)
+    try:
+        runtime.run(pool.start())
+    except Exception as exc:
+        logger.warning("browser_pool_warmup_failed err=%s", str(exc))
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**_: object) -> None:
+    runtime.shutdown()
+
+
+def _retry_countdown(retries: int) -> int:
+    return min(300, 5 * (2**retries)) + random.randint(0, 3)
+
+
+def _defer_countdown(exc: CircuitOpen | RateLimited) -> int:
+    countdown = max(1, round(exc.retry_after))
+    if isinstance(exc, CircuitOpen):
+        # Spread deferred tasks out so they don't all return at once and queue up behind one probe.
+        countdown += random.randint(0, max(1, countdown // 10))
+    return countdown
+
+
+def _current_queue(task: Task) -> str | None:
+    # Follow-up tasks stay on the queue this one came from instead of going back through task_routes.
+    return (task.request.delivery_info or {}).get("routing_key")
+
+
+def _pass_inflight(
+    task: Task,
+    product_ids: list[int],
+    task_id: str | None,
+    next_task_id: str | None = None,
+    countdown: float = 0,
+) -> None:
+    # Hands the products' in-flight claim to the task that will pick them up next, or frees it.
+    registry = get_inflight_registry()
+    try:
+        if next_task_id is None:
+            runtime.run(registry.release(product_ids, task_id))
+        else:
+            runtime.run(registry.handover(product_ids, task_id, next_task_id, inflight_ttl_s(task, countdown)))
+    except RedisError as exc:
+        logger.warning("inflight_handover_failed task_id=%s count=%s err=%s", task_id, len(product_ids), str(exc))
+
+
+def _batch_deadline_s(task: Task) -> float | None:
+    soft_limit_s = (task.request.timelimit or (None, None))[1] or task.soft_time_limit
+    soft_limit_s = soft_limit_s or task.app.conf.task_soft_time_limit
+    return max(1.0, soft_limit_s - _BATCH_WRAP_UP_S) if soft_limit_s else None
+
+
+async def _scrape_batch(
+    product_ids: list[int],
+    concurrency: int,
+    deadline_s: float | None = None,
+) -> list[ParsedPrice | BaseException]:
+    fetch_slot = asyncio.Semaphore(max(1, concurrency))
+    tasks = [
+        asyncio.ensure_future(_scrape_and_persist(product_id=pid, user_agent=_USER_AGENT, fetch_slot=fetch_slot))
+        for pid in product_ids
+    ]
+
+    # Stop short of the soft time limit so finished results are kept and the rest can be re-queued,
+    # instead of SoftTimeLimitExceeded discarding the whole batch.
+    _, pending = await asyncio.wait(tasks, timeout=deadline_s)
+    if pending:
+        logger.warning(
+            "scrape_batch_deadline count=%s unfinished=%s deadline_s=%s",
+            len(tasks),
+            len(pending),
+            deadline_s,
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return [
+        BatchDeadlineExceeded() if task.cancelled() else task.exception() or task.result()
+        for task in tasks
+    ]
+
+
 @celery_app.task(bind=True, base=FluxTask, name="flux_monitor.scrape_product")
 def scrape_product(self: FluxTask, product_id: int) -> dict:
     task_id = getattr(self.request, "id", None)
@@ -157,16 +593,69 @@ def scrape_product(self: FluxTask, product_id: int) -> dict:
     logger.info("scrape_start task_id=%s product_id=%s", task_id, product_id)
 
     try:
-        parsed = asyncio.run(
+        parsed = runtime.run(
             _scrape_and_persist(
                 product_id=product_id,
-                user_agent="FluxMonitor/1.0 (+https://example.local)",
-                politeness_delay_s=(0.5, 2.0),
+                user_agent=_USER_AGENT,
+            )
+        )
+    except BrowserRequired as exc:
+        browser_task_id = uuid()
+        _pass_inflight(self, [product_id], task_id, browser_task_id)
+        scrape_product.apply_async(
+            (product_id,),
+            queue=QUEUE_BROWSER,
+            retries=int(getattr(self.request, "retries", 0)),
+            task_id=browser_task_id,
+        )
+        logger.info(
+            "scrape_escalated task_id=%s product_id=%s domain=%s browser_task_id=%s",
+            task_id,
+            product_id,
+            exc.domain,
+            browser_task_id,
+        )
+        return {"product_id": product_id, "escalated": True, "task_id": browser_task_id}
+    except (CircuitOpen, RateLimited) as exc:
+        reason = _scrape_outcome(exc)
+        if isinstance(exc, CircuitOpen) and settings.circuit_breaker_open_action == "skip":
+            logger.info(
+                "scrape_skipped task_id=%s product_id=%s domain=%s reason=%s",
+                task_id,
+                product_id,
+                exc.domain,
+                reason,
             )
+            _pass_inflight(self, [product_id], task_id)
+            return {"product_id": product_id, "skipped": True, "domain": exc.domain}
+
+        countdown = _defer_countdown(exc)
+        deferred_task_id = uuid()
+        _pass_inflight(self, [product_id], task_id, deferred_task_id, countdown)
+        deferred = scrape_product.apply_async(
+            (product_id,),
+            countdown=countdown,
+            queue=_current_queue(self),
+            retries=int(getattr(self.request, "retries", 0)),
+            task_id=deferred_task_id,
         )
+        logger.info(
+            "scrape_deferred task_id=%s product_id=%s domain=%s reason=%s countdown=%s deferred_task_id=%s",
+            task_id,
+            product_id,
+            exc.domain,
+            reason,
+            countdown,
+            deferred.id,
+        )
+        return {"product_id": product_id, "deferred": True, "task_id": deferred.id}
     except PlaywrightTimeoutError as exc:
         retries = int(getattr(self.request, "retries", 0))
-        countdown = min(300, 5 * (2**retries)) + random.randint(0, 3)
+        countdown = _retry_countdown(retries)
+        if retries >= _MAX_RETRIES:
+            _pass_inflight(self, [product_id], task_id)
+        else:
+            _pass_inflight(self, [product_id], task_id, task_id, countdown)
         logger.warning(
             "scrape_retry_timeout task_id=%s product_id=%s retries=%s countdown=%s err=%s",
             task_id,
@@ -175,10 +664,10 @@ def scrape_product(self: FluxTask, product_id: int) -> dict:
             countdown,
             str(exc),
         )
-        raise self.retry(exc=exc, countdown=countdown, max_retries=5)
+        raise self.retry(exc=exc, countdown=countdown, max_retries=_MAX_RETRIES)
     except Exception as exc:
         retries = int(getattr(self.request, "retries", 0))
-        if retries >= 5:
+        if retries >= _MAX_RETRIES:
             logger.error(
                 "scrape_failed task_id=%s product_id=%s retries=%s err=%s",
                 task_id,
@@ -186,9 +675,11 @@ def scrape_product(self: FluxTask, product_id: int) -> dict:
                 retries,
                 str(exc),
             )
+            _pass_inflight(self, [product_id], task_id)
             raise
 
-        countdown = min(300, 5 * (2**retries)) + random.randint(0, 3)
+        countdown = _retry_countdown(retries)
+        _pass_inflight(self, [product_id], task_id, task_id, countdown)
         logger.warning(
             "scrape_retry task_id=%s product_id=%s retries=%s countdown=%s err=%s",
             task_id,
@@ -197,8 +688,9 @@ def scrape_product(self: FluxTask, product_id: int) -> dict:
             countdown,
             str(exc),
         )
-        raise self.retry(exc=exc, countdown=countdown, max_retries=5)
+        raise self.retry(exc=exc, countdown=countdown, max_retries=_MAX_RETRIES)
 
+    _pass_inflight(self, [product_id], task_id)
     logger.info(
         "scrape_success task_id=%s product_id=%s amount=%s currency=%s",
         task_id,
@@ -206,4 +698,173 @@ def scrape_product(self: FluxTask, product_id: int) -> dict:
         str(parsed.amount),
         parsed.currency,
     )
-    return {"product_id": product_id, "price": str(parsed.amount), "currency": parsed.currency}
+    return {
+        "product_id": product_id,
+        "price": str(parsed.amount),
+        "currency": parsed.currency,
+        "unchanged": parsed.unchanged,
+    }
+
+
+@celery_app.task(
+    bind=True,
+    base=FluxTask,
+    name="flux_monitor.scrape_batch",
+)
+def scrape_batch(self: FluxTask, product_ids: list[int], attempt: int = 0) -> dict:
+    task_id = getattr(self.request, "id", None)
+
+    logger.info("scrape_batch_start task_id=%s count=%s attempt=%s", task_id, len(product_ids), attempt)
+
+    outcomes = runtime.run(
+        _scrape_batch(
+            product_ids,
+            concurrency=settings.scrape_batch_concurrency,
+            deadline_s=_batch_deadline_s(self),
+        )
+    )
+
+    results: list[dict] = []
+    retry_ids: list[int] = []
+    deferred_ids: list[int] = []
+    browser_ids: list[int] = []
+    deferred_after = 0
+    skipped = 0
+    for product_id, outcome in zip(product_ids, outcomes):
+        if isinstance(outcome, BrowserRequired):
+            results.append({"product_id": product_id, "status": "escalated", "domain": outcome.domain})
+            browser_ids.append(product_id)
+        elif isinstance(outcome, CircuitOpen) and settings.circuit_breaker_open_action == "skip":
+            results.append({"product_id": product_id, "status": "skipped", "domain": outcome.domain})
+            skipped += 1
+        elif isinstance(outcome, (CircuitOpen, RateLimited)):
+            results.append({"product_id": product_id, "status": "deferred", "domain": outcome.domain})
+            deferred_ids.append(product_id)
+            deferred_after = max(deferred_after, _defer_countdown(outcome))
+        elif isinstance(outcome, BatchDeadlineExceeded):
+            results.append({"product_id": product_id, "status": "deferred", "reason": "batch_deadline"})
+            deferred_ids.append(product_id)
+        elif isinstance(outcome, ParsedPrice):
+            logger.info(
+                "scrape_success task_id=%s product_id=%s amount=%s currency=%s",
+                task_id,
+                product_id,
+                str(outcome.amount),
+                outcome.currency,
+            )
+            results.append(
+                {
+                    "product_id": product_id,
+                    "status": "ok",
+                    "price": str(outcome.amount),
+                    "currency": outcome.currency,
+                    "unchanged": outcome.unchanged,
+                }
+            )
+        elif attempt >= _MAX_RETRIES:
+            logger.error(
+                "scrape_failed task_id=%s product_id=%s retries=%s err=%s",
+                task_id,
+                product_id,
+                attempt,
+                str(outcome),
+            )
+            results.append({"product_id": product_id, "status": "failed", "error": str(outcome)})
+        else:
+            logger.warning(
+                "scrape_retry task_id=%s product_id=%s retries=%s err=%s",
+                task_id,
+                product_id,
+                attempt,
+                str(outcome),
+            )
+            results.append({"product_id": product_id, "status": "retrying", "error": str(outcome)})
+            retry_ids.append(product_id)
+
+    forwarded = {*retry_ids, *deferred_ids, *browser_ids}
+    finished_ids = [pid for pid in product_ids if pid not in forwarded]
+    if finished_ids:
+        _pass_inflight(self, finished_ids, task_id)
+
+    retry_task_id = None
+    if retry_ids:
+        countdown = _retry_countdown(attempt)
+        retry_task_id = uuid()
+        _pass_inflight(self, retry_ids, task_id, retry_task_id, countdown)
+        scrape_batch.apply_async(
+            args=(retry_ids,),
+            kwargs={"attempt": attempt + 1},
+            countdown=countdown,
+            queue=_current_queue(self),
+            task_id=retry_task_id,
+        )
+        logger.info(
+            "scrape_batch_retry task_id=%s retry_task_id=%s count=%s countdown=%s",
+            task_id,
+            retry_task_id,
+            len(retry_ids),
+            countdown,
+        )
+
+    deferred_task_id = None
+    if deferred_ids:
+        countdown = deferred_after
+        deferred_task_id = uuid()
+        _pass_inflight(self, deferred_ids, task_id, deferred_task_id, countdown)
+        scrape_batch.apply_async(
+            args=(deferred_ids,),
+            kwargs={"attempt": attempt},
+            countdown=countdown,
+            queue=_current_queue(self),
+            task_id=deferred_task_id,
+        )
+        logger.info(
+            "scrape_batch_deferred task_id=%s deferred_task_id=%s count=%s countdown=%s",
+            task_id,
+            deferred_task_id,
+            len(deferred_ids),
+            countdown,
+        )
+
+    browser_task_id = None
+    if browser_ids:
+        browser_task_id = uuid()
+        _pass_inflight(self, browser_ids, task_id, browser_task_id)
+        scrape_batch.apply_async(
+            args=(browser_ids,),
+            kwargs={"attempt": attempt},
+            queue=QUEUE_BROWSER,
+            task_id=browser_task_id,
+        )
+        logger.info(
+            "scrape_batch_escalated task_id=%s browser_task_id=%s count=%s",
+            task_id,
+            browser_task_id,
+            len(browser_ids),
+        )
+
+    succeeded = sum(1 for item in results if item["status"] == "ok")
+    pending = len(retry_ids) + len(deferred_ids) + len(browser_ids)
+    logger.info(
+        "scrape_batch_done task_id=%s count=%s succeeded=%s retrying=%s deferred=%s escalated=%s skipped=%s",
+        task_id,
+        len(product_ids),
+        succeeded,
+        len(retry_ids),
+        len(deferred_ids),
+        len(browser_ids),
+        skipped,
+    )
+    return {
+        "attempt": attempt,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded - pending - skipped,
+        "retrying": len(retry_ids),
+        "deferred": len(deferred_ids),
+        "escalated": len(browser_ids),
+        "skipped": skipped,
+        "retry_task_id": retry_task_id,
+        "deferred_task_id": deferred_task_id,
+        "browser_task_id": browser_task_id,
+        "results": results,
+    }
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from app.core.settings import settings
+from bench.fixtures import PAGE_KINDS
+from bench.report import compare, format_summary, summarize
+from bench.runner import BenchConfig, run_benchmark
+
+
+def _kinds(value: str) -> tuple[str, ...]:
+    kinds = tuple(kind.strip() for kind in value.split(",") if kind.strip())
+    unknown = sorted(set(kinds) - set(PAGE_KINDS))
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown page kinds: {', '.join(unknown)}")
+    return kinds
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="FluxMonitor scrape benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="scrape a local fixture site and report throughput and latency")
+    run.add_argument(
+        "--kinds",
+        type=_kinds,
+        default=PAGE_KINDS,
+        help=f"comma-separated subset of {','.join(PAGE_KINDS)}",
+    )
+    run.add_argument("--pages-per-kind", type=int, default=20)
+    run.add_argument("--workers", type=int, default=1, help="worker processes, like Celery prefork children")
+    run.add_argument("--concurrency", type=int, default=settings.scrape_batch_concurrency, help="fetches per batch")
+    run.add_argument("--batch-size", type=int, default=settings.scrape_batch_size)
+    run.add_argument("--rounds", type=int, default=1, help="scrape every page this many times")
+    run.add_argument("--slow-delay", type=float, default=1.5, help="response delay of 'slow' pages in seconds")
+    run.add_argument("--rate-limit", action="store_true", help="keep the per-domain rate limiter on")
+    run.add_argument("--keep-products", action="store_true", help="leave fixture products in the database")
+    run.add_argument("--label", help="name stored with the results")
+    run.add_argument("--output", type=Path, help="write the results as JSON to this file")
+    run.add_argument("--log-level", default="WARNING")
+
+    diff = commands.add_parser("compare", help="compare two result files")
+    diff.add_argument("base", type=Path)
+    diff.add_argument("head", type=Path)
+    diff.add_argument("--threshold", type=float, default=0.10, help="relative change that counts as a regression")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+
+    if args.command == "compare":
+        base = json.loads(args.base.read_text(encoding="utf-8"))
+        head = json.loads(args.head.read_text(encoding="utf-8"))
+        table, regressed = compare(base, head, args.threshold)
+        print(table)
+        return 1 if regressed else 0
+
+    logging.basicConfig(level=args.log_level)
+    config = BenchConfig(
+        kinds=args.kinds,
+        pages_per_kind=args.pages_per_kind,
+        workers=max(1, args.workers),
+        concurrency=max(1, args.concurrency),
+        batch_size=max(1, args.batch_size),
+        rounds=max(1, args.rounds),
+        slow_delay_s=args.slow_delay,
+        rate_limit=args.rate_limit,
+        keep_products=args.keep_products,
+        log_level=args.log_level,
+    )
+    result = summarize(config, run_benchmark(config), label=args.label)
+    print(format_summary(result))
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
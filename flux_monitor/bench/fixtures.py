@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+PAGE_KINDS: tuple[str, ...] = ("static", "meta", "jsonld", "js", "slow", "broken")
+
+_PAGE_TEMPLATE = """<!doctype html>
+<html>
+<head>
+<title>Fixture {kind} #{index}</title>
+{head}
+</head>
+<body>
+<header><nav><a href="/">Fixture shop</a></nav></header>
+<main>
+<h1>Fixture product {index}</h1>
+{body}
+<section class="description">{filler}</section>
+</main>
+</body>
+</html>
+"""
+
+_FILLER = " ".join(["<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>"] * 40)
+
+
+def fixture_price(index: int) -> Decimal:
+    return Decimal(10 + index % 90) + Decimal("0.99")
+
+
+def render_page(kind: str, index: int) -> str:
+    price = fixture_price(index)
+    head = ""
+    body = ""
+    if kind in ("static", "slow"):
+        body = f'<div class="product-info"><span class="price">${price}</span></div>'
+    elif kind == "meta":
+        head = (
+            f'<meta property="product:price:amount" content="{price}">\n'
+            '<meta property="product:price:currency" content="EUR">'
+        )
+    elif kind == "jsonld":
+        offer = {
+            "@context": "https://schema.org",
+            "@type": "Product",
+            "name": f"Fixture product {index}",
+            "offers": {"@type": "Offer", "price": str(price), "priceCurrency": "GBP"},
+        }
+        head = f'<script type="application/ld+json">{json.dumps(offer)}</script>'
+    elif kind == "js":
+        body = (
+            '<div id="app"></div>\n'
+            "<script>setTimeout(function () {"
+            f"document.getElementById('app').innerHTML = '<span class=\"price\">&#36;{price}</span>';"
+            "}, 50);</script>"
+        )
+    elif kind == "broken":
+        return f"<html><head><title>Fixture broken #{index}</title><body><div class='product'><h1>Out of stock<div"
+    else:
+        raise ValueError(f"Unknown fixture page kind: {kind}")
+
+    return _PAGE_TEMPLATE.format(kind=kind, index=index, head=head, body=body, filler=_FILLER)
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _FixtureServer
+
+    def do_GET(self) -> None:
+        try:
+            index = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+        except ValueError:
+            self._send(404, b"not found", "text/plain")
+            return
+
+        if self.server.kind == "slow":
+            time.sleep(self.server.slow_delay_s)
+
+        body = render_page(self.server.kind, index).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", None, etag)
+            return
+
+        self._send(200, body, "text/html; charset=utf-8", etag)
+
+    def _send(self, status: int, body: bytes, content_type: str | None, etag: str | None = None) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class _FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, kind: str, slow_delay_s: float) -> None:
+        super().__init__((host, 0), _FixtureHandler)
+        self.kind = kind
+        self.slow_delay_s = slow_delay_s
+
+
+class FixtureSite:
+    # Each page kind is served from its own loopback address, so per-domain state
+    # (fetch strategy, selector cache, rate limits) stays separate like it would for real shops.
+    def __init__(
+        self,
+        kinds: tuple[str, ...] = PAGE_KINDS,
+        slow_delay_s: float = 1.5,
+        host_prefix: str = "127.0.0.",
+    ) -> None:
+        self._kinds = kinds
+        self._slow_delay_s = slow_delay_s
+        self._host_prefix = host_prefix
+        self._servers: dict[str, _FixtureServer] = {}
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> FixtureSite:
+        for offset, kind in enumerate(self._kinds):
+            server = _FixtureServer(f"{self._host_prefix}{10 + offset}", kind, self._slow_delay_s)
+            thread = threading.Thread(target=server.serve_forever, name=f"fixture-{kind}", daemon=True)
+            thread.start()
+            self._servers[kind] = server
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+        self._threads.clear()
+
+    def __enter__(self) -> FixtureSite:
+        return self.start()
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+    def hosts(self) -> list[str]:
+        return [server.server_address[0] for server in self._servers.values()]
+
+    def url(self, kind: str, index: int) -> str:
+        host, port = self._servers[kind].server_address[:2]
+        return f"http://{host}:{port}/products/{kind}/{index}"
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import math
+import platform
+from collections import Counter
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.settings import settings
+from bench.runner import BenchConfig
+
+
+_PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def distribution(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"count": 0}
+    summary = {"count": len(values), "mean": round(sum(values) / len(values), 2)}
+    for pct in _PERCENTILES:
+        summary[f"p{pct}"] = round(percentile(values, pct), 2)
+    summary["max"] = round(max(values), 2)
+    return summary
+
+
+def _phases(samples: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    by_phase: dict[str, list[float]] = {}
+    for sample in samples:
+        for name, elapsed_ms in sample["phases"].items():
+            by_phase.setdefault(name, []).append(elapsed_ms)
+    return {name: distribution(values) for name, values in sorted(by_phase.items())}
+
+
+def _section(samples: list[dict[str, Any]], wall_s: float) -> dict[str, Any]:
+    return {
+        "pages": len(samples),
+        "pages_per_s": round(len(samples) / wall_s, 2) if wall_s > 0 else None,
+        "outcomes": dict(Counter(sample["outcome"] for sample in samples)),
+        "latency_ms": distribution([sample["total_ms"] for sample in samples]),
+        "phases_ms": _phases(samples),
+    }
+
+
+def summarize(config: BenchConfig, reports: list[dict[str, Any]], label: str | None = None) -> dict[str, Any]:
+    samples = [sample for report in reports for sample in report["samples"]]
+    wall_s = max(report["finished"] for report in reports) - min(report["started"] for report in reports)
+
+    errors = Counter(sample["error"] for sample in samples if sample["error"])
+    return {
+        "meta": {
+            "label": label,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": asdict(config),
+            "settings": {
+                "static_fetch_enabled": settings.static_fetch_enabled,
+                "conditional_fetch_enabled": settings.conditional_fetch_enabled,
+                "resource_blocking_enabled": settings.resource_blocking_enabled,
+                "price_write_mode": settings.price_write_mode,
+                "price_storage_mode": settings.price_storage_mode,
+                "browser_pool_size": settings.browser_pool_size,
+            },
+        },
+        "wall_s": round(wall_s, 3),
+        **_section(samples, wall_s),
+        "by_kind": {
+            kind: _section([sample for sample in samples if sample["kind"] == kind], wall_s) for kind in config.kinds
+        },
+        "by_round": {
+            str(round_no): _section([sample for sample in samples if sample["round"] == round_no], wall_s)
+            for round_no in range(config.rounds)
+        },
+        "workers": [
+            {
+                "pid": report["pid"],
+                "pages": len(report["samples"]),
+                "wall_s": round(report["finished"] - report["started"], 3),
+                "peak_rss_mb": report["peak_rss_mb"],
+                "peak_tree_rss_mb": report["peak_tree_rss_mb"],
+            }
+            for report in reports
+        ],
+        "top_errors": [{"error": error, "count": count} for error, count in errors.most_common(10)],
+    }
+
+
+def _latency_row(name: str, summary: dict[str, float]) -> str:
+    if not summary.get("count"):
+        return f"  {name:<18} -"
+    return (
+        f"  {name:<18} n={summary['count']:<6} p50={summary['p50']:>9.1f} "
+        f"p95={summary['p95']:>9.1f} p99={summary['p99']:>9.1f} max={summary['max']:>9.1f}"
+    )
+
+
+def format_summary(result: dict[str, Any]) -> str:
+    lines = [
+        f"pages={result['pages']} wall_s={result['wall_s']} pages_per_s={result['pages_per_s']}",
+        "outcomes " + " ".join(f"{key}={value}" for key, value in sorted(result["outcomes"].items())),
+        "latency (ms)",
+        _latency_row("total", result["latency_ms"]),
+    ]
+    lines.extend(_latency_row(name, summary) for name, summary in result["phases_ms"].items())
+
+    lines.append("by kind (ms)")
+    for kind, section in result["by_kind"].items():
+        outcomes = ",".join(f"{key}:{value}" for key, value in sorted(section["outcomes"].items()))
+        lines.append(f"{_latency_row(kind, section['latency_ms'])} outcomes={outcomes}")
+
+    lines.append("workers")
+    for worker in result["workers"]:
+        lines.append(
+            f"  pid={worker['pid']} pages={worker['pages']} wall_s={worker['wall_s']} "
+            f"peak_rss_mb={worker['peak_rss_mb']} peak_tree_rss_mb={worker['peak_tree_rss_mb']}"
+        )
+
+    for item in result["top_errors"]:
+        lines.append(f"error x{item['count']}: {item['error']}")
+    return "\n".join(lines)
+
+
+def _comparable_metrics(result: dict[str, Any]) -> dict[str, tuple[float, bool]]:
+    # metric -> (value, higher_is_better)
+    metrics: dict[str, tuple[float, bool]] = {"pages_per_s": (result["pages_per_s"] or 0.0, True)}
+    for pct in _PERCENTILES:
+        if result["latency_ms"].get("count"):
+            metrics[f"total.p{pct}_ms"] = (result["latency_ms"][f"p{pct}"], False)
+    for name, summary in result["phases_ms"].items():
+        if summary.get("count"):
+            metrics[f"{name}.p95_ms"] = (summary["p95"], False)
+    for kind, section in result["by_kind"].items():
+        if section["latency_ms"].get("count"):
+            metrics[f"{kind}.p95_ms"] = (section["latency_ms"]["p95"], False)
+    metrics["peak_tree_rss_mb"] = (max(worker["peak_tree_rss_mb"] for worker in result["workers"]), False)
+    return metrics
+
+
+def compare(base: dict[str, Any], head: dict[str, Any], threshold: float) -> tuple[str, bool]:
+    base_metrics = _comparable_metrics(base)
+    head_metrics = _comparable_metrics(head)
+
+    lines = [f"{'metric':<28} {'base':>12} {'head':>12} {'change':>9}"]
+    regressed = False
+    for name, (base_value, higher_is_better) in base_metrics.items():
+        if name not in head_metrics:
+            continue
+        head_value = head_metrics[name][0]
+        change = (head_value - base_value) / base_value if base_value else 0.0
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        lines.append(f"{name:<28} {base_value:>12.2f} {head_value:>12.2f} {change:>+8.1%}{flag}")
+
+    return "\n".join(lines), regressed
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from multiprocessing.queues import Queue
+from multiprocessing.synchronize import Barrier
+from typing import Any
+
+from celery.signals import worker_process_init, worker_process_shutdown
+from sqlalchemy import delete
+
+from app.core import runtime
+from app.core.db import async_session_maker, engine
+from app.core.redis import close_async_redis, get_async_redis
+from app.core.settings import settings
+from app.models.product import Product
+from app.scraping.trace import traced
+from app.tasks.schedule import chunked
+from app.tasks.scrape import _scrape_and_persist
+from bench.fixtures import FixtureSite, fixture_price
+
+
+logger = logging.getLogger(__name__)
+
+_USER_AGENT = "FluxMonitor/1.0 (+https://example.local) bench"
+_PAGE_SIZE_BYTES = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_RSS_SAMPLE_INTERVAL_S = 0.25
+
+
+@dataclass(frozen=True)
+class BenchConfig:
+    kinds: tuple[str, ...]
+    pages_per_kind: int
+    workers: int
+    concurrency: int
+    batch_size: int
+    rounds: int
+    slow_delay_s: float
+    rate_limit: bool
+    keep_products: bool
+    log_level: str = "WARNING"
+
+
+@dataclass(frozen=True)
+class BenchPage:
+    product_id: int
+    kind: str
+    index: int
+
+
+async def _create_products(site: FixtureSite, config: BenchConfig) -> list[BenchPage]:
+    redis = get_async_redis()
+    for host in site.hosts():
+        await redis.delete(f"flux:strategy:{host}", f"flux:ratelimit:{host}", f"flux:selector:domain:{host}")
+
+    # Far-future due times keep the scheduler from picking fixture products up mid-run.
+    not_due = datetime.now(timezone.utc) + timedelta(days=36500)
+    products = [
+        (kind, index, Product(name=f"bench {kind} {index}", url=site.url(kind, index), next_due_at=not_due))
+        for kind in config.kinds
+        for index in range(config.pages_per_kind)
+    ]
+    try:
+        async with async_session_maker() as session:
+            session.add_all([product for _, _, product in products])
+            await session.commit()
+        return [BenchPage(product.id, kind, index) for kind, index, product in products]
+    finally:
+        await close_async_redis()
+        await engine.dispose()
+
+
+async def _delete_products(product_ids: list[int]) -> None:
+    try:
+        async with async_session_maker() as session:
+            await session.execute(delete(Product).where(Product.id.in_(product_ids)))
+            await session.commit()
+    finally:
+        await engine.dispose()
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE_BYTES
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def _process_tree(root: int) -> list[int]:
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii", errors="replace") as fh:
+                parent = int(fh.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    tree = [root]
+    for pid in tree:
+        tree.extend(children.get(pid, []))
+    return tree
+
+
+@dataclass
+class _PeakRss:
+    tree_mb: float = 0.0
+
+    async def sample(self) -> None:
+        # Includes the Playwright driver and Chromium processes spawned by this worker.
+        while True:
+            if os.path.isdir("/proc"):
+                total = sum(_rss_bytes(pid) for pid in _process_tree(os.getpid()))
+                self.tree_mb = max(self.tree_mb, total / (1024 * 1024))
+            await asyncio.sleep(_RSS_SAMPLE_INTERVAL_S)
+
+
+async def _scrape_page(page: BenchPage, round_no: int, fetch_slot: asyncio.Semaphore) -> dict[str, Any]:
+    error = None
+    with traced() as trace:
+        started = time.perf_counter()
+        try:
+            parsed = await _scrape_and_persist(page.product_id, _USER_AGENT, fetch_slot)
+        except Exception as exc:
+            outcome = "error"
+            error = f"{type(exc).__name__}: {exc}"[:200]
+        else:
+            if parsed.amount != fixture_price(page.index):
+                outcome = "wrong_price"
+            else:
+                outcome = "unchanged" if parsed.unchanged else "ok"
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "kind": page.kind,
+        "round": round_no,
+        "outcome": outcome,
+        "error": error,
+        "total_ms": elapsed_ms,
+        "phases": trace.phases,
+    }
+
+
+async def _scrape_pages(pages: list[BenchPage], config: BenchConfig, peak: _PeakRss) -> list[dict[str, Any]]:
+    sampler = asyncio.create_task(peak.sample())
+    samples: list[dict[str, Any]] = []
+    try:
+        for round_no in range(config.rounds):
+            for batch in chunked(pages, config.batch_size):
+                fetch_slot = asyncio.Semaphore(max(1, config.concurrency))
+                samples.extend(await asyncio.gather(*(_scrape_page(page, round_no, fetch_slot) for page in batch)))
+    finally:
+        sampler.cancel()
+    return samples
+
+
+def _worker_main(pages: list[BenchPage], config: BenchConfig, barrier: Barrier, results: Queue) -> None:
+    logging.basicConfig(level=config.log_level)
+    settings.rate_limit_enabled = config.rate_limit
+
+    # Same lifecycle as a Celery prefork child: warm the browser pool before the clock starts.
+    worker_process_init.send(sender=None)
+    peak = _PeakRss()
+    try:
+        barrier.wait(timeout=300)
+        started = time.time()
+        samples = runtime.run(_scrape_pages(pages, config, peak))
+        finished = time.time()
+    finally:
+        worker_process_shutdown.send(sender=None)
+
+    results.put(
+        {
+            "pid": os.getpid(),
+            "started": started,
+            "finished": finished,
+            "samples": samples,
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "peak_tree_rss_mb": round(peak.tree_mb, 1),
+        }
+    )
+
+
+def run_benchmark(config: BenchConfig) -> list[dict[str, Any]]:
+    ctx = multiprocessing.get_context("spawn")
+
+    with FixtureSite(config.kinds, slow_delay_s=config.slow_delay_s) as site:
+        pages = asyncio.run(_create_products(site, config))
+        logger.info("bench_products_created count=%s kinds=%s", len(pages), ",".join(config.kinds))
+
+        barrier = ctx.Barrier(config.workers)
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(target=_worker_main, args=(pages[slot :: config.workers], config, barrier, results))
+            for slot in range(config.workers)
+        ]
+        try:
+            for worker in workers:
+                worker.start()
+            reports: list[dict[str, Any]] = []
+            while len(reports) < len(workers):
+                try:
+                    reports.append(results.get(timeout=5))
+                except queue.Empty:
+                    if any(worker.exitcode not in (None, 0) for worker in workers):
+                        raise RuntimeError("A benchmark worker exited before reporting results")
+        finally:
+            for worker in workers:
+                worker.join(timeout=30)
+                if worker.is_alive():
+                    worker.terminate()
+            if not config.keep_products:
+                asyncio.run(_delete_products([page.product_id for page in pages]))
+
+    return reports
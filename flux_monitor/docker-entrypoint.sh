@@ -0,0 +1,12 @@
+#!/bin/sh
+set -e
+
+# prometheus_client opens its per-process files as soon as app.core.metrics is imported, and Celery
+# imports the task modules before any worker signal fires, so the directory must exist (and be free
+# of a previous run's files) before Python starts.
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    find "$PROMETHEUS_MULTIPROC_DIR" -mindepth 1 -delete
+fi
+
+exec "$@"